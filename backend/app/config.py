@@ -4,7 +4,7 @@ Loads environment variables and provides app-wide settings
 """
 
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 from functools import lru_cache
 
 
@@ -75,6 +75,68 @@ class Settings(BaseSettings):
     OPENAI_MODEL: str = "gpt-4"
     HUGGINGFACE_API_KEY: str = ""
     
+    # Emotion Detection
+    EMOTION_MODEL_PATH: str = ""  # Empty = emotion_model.tflite, else emotion_model.h5 in emotion_detection/
+    EMOTION_INFERENCE_BACKEND: str = "auto"  # auto (by model file extension) | keras | tflite
+    EMOTION_WORKERS: int = 2  # Worker processes in the emotion inference pool
+    EMOTION_INTRA_OP_THREADS: int = 0  # Threads per model op in each worker, also OpenCV's (0 = library default)
+    EMOTION_INTER_OP_THREADS: int = 0  # TensorFlow ops run in parallel per worker (0 = default; keras only)
+    EMOTION_WORKER_CPUS: str = ""  # CPUs emotion workers may run on, e.g. "0-7,16-23" (empty = all)
+    EMOTION_PIN_WORKERS: bool = False  # Pin each emotion worker to its own share of those CPUs
+    EMOTION_SERVER_SOCKET: str = ""  # Unix socket of a shared emotion model server (empty = pool per API process)
+    EMOTION_STAGE_TIMING: bool = True  # Per-stage latency histograms at /api/emotion/metrics (set at startup)
+    EMOTION_BATCH_MAX_SIZE: int = 16  # Max frames per batched model call
+    EMOTION_BATCH_MAX_WAIT_MS: float = 10.0  # Max time a frame waits for its batch
+    EMOTION_MAX_IN_FLIGHT: int = 64  # Live frames analyzed at once before new ones get 429 (0 = unlimited)
+    EMOTION_MAX_FRAME_AGE_SECONDS: float = 2.0  # Skip live frames this late or this far behind the session (0 = off)
+    EMOTION_RESULT_CACHE_SIZE: int = 1024  # Results cached by image content hash for retried frames (0 = off)
+    EMOTION_RESULT_CACHE_MAX_MB: float = 16.0  # Estimated memory cap of the result cache
+    EMOTION_RESULT_CACHE_TTL_SECONDS: float = 300.0  # Maximum age of a cached result
+    EMOTION_JOB_CONCURRENCY: int = 2  # Background emotion jobs analyzed at once (others wait queued)
+    EMOTION_JOB_MAX_PENDING: int = 32  # Queued plus running jobs before new ones get 429 (0 = unlimited)
+    EMOTION_JOB_TTL_SECONDS: float = 600.0  # How long finished job results can be polled
+    EMOTION_SESSION_TTL_SECONDS: int = 900  # Idle time before live session state is dropped
+    EMOTION_REDETECT_INTERVAL: int = 5  # Full face detection every N live frames (1 = every frame)
+    EMOTION_DEDUP_WINDOW_SECONDS: float = 2.0  # Reuse results of near-identical live frames this recent (0 = off)
+    EMOTION_DEDUP_MAX_DISTANCE: int = 4  # Max perceptual-hash distance (of 64 bits) for a near-duplicate
+    EMOTION_DEDUP_CACHE_SIZE: int = 8  # Cached frames per live session
+    EMOTION_SENTIMENT_EMA_ALPHA: float = 0.1  # Weight of the newest frame in the running sentiment EMA
+    EMOTION_VIDEO_SAMPLE_FPS: float = 2.0  # Frames analyzed per second of recorded answer video
+    EMOTION_SAMPLING_MIN_RATE: float = 0.5  # Adaptive sampling: frames/s analyzed in static scenes (0 = off)
+    EMOTION_SAMPLING_MAX_RATE: float = 5.0  # Adaptive sampling: max frames/s analyzed while the face changes
+    EMOTION_SAMPLING_THRESHOLD: float = 8.0  # Thumbnail mean abs difference (0-255) that counts as a change
+    EMOTION_DETECTION_WIDTH: int = 320  # Downscale frames to this width for face detection (0 = full size)
+    EMOTION_FACE_DETECTOR: str = "dlib"  # Default face detector: dlib | haar | lbp | dnn
+    EMOTION_QUALITY_TIERS: str = "fast:haar,accurate:dlib"  # Per-request `quality` tiers as tier:detector pairs
+    EMOTION_FACE_LBP_CASCADE: str = ""  # LBP cascade XML (empty = emotion_detection/models/)
+    EMOTION_FACE_DNN_PROTOTXT: str = ""  # DNN detector Caffe prototxt (empty = emotion_detection/models/)
+    EMOTION_FACE_DNN_WEIGHTS: str = ""  # DNN detector Caffe weights (empty = emotion_detection/models/)
+    EMOTION_FACE_DNN_CONFIDENCE: float = 0.5  # Minimum DNN face detection confidence
+    EMOTION_DETECTION_UPSAMPLE: int = 1  # face_recognition number_of_times_to_upsample (dlib)
+    EMOTION_DETECTION_MODEL: str = "hog"  # face_recognition model: hog | cnn (dlib)
+    EMOTION_MAX_FRAME_WIDTH: int = 640  # Working resolution; larger JPEGs are decoded at reduced size
+    EMOTION_MAX_FRAME_HEIGHT: int = 480  # Preferred capture height reported to clients
+    
+    @property
+    def emotion_quality_tiers(self) -> Dict[str, str]:
+        """Parse emotion quality tiers into a tier -> face detector mapping"""
+        tiers = {}
+        for pair in self.EMOTION_QUALITY_TIERS.split(","):
+            tier, _, detector = pair.partition(":")
+            if tier.strip() and detector.strip():
+                tiers[tier.strip()] = detector.strip()
+        return tiers
+    
+    @property
+    def emotion_worker_cpus(self) -> List[int]:
+        """Parse the emotion worker CPU list ("0-3,8") into CPU ids"""
+        cpus = set()
+        for part in self.EMOTION_WORKER_CPUS.split(","):
+            first, _, last = part.strip().partition("-")
+            if first:
+                cpus.update(range(int(first), int(last or first) + 1))
+        return sorted(cpus)
+    
     # Redis Configuration
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PASSWORD: str = ""
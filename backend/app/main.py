@@ -15,7 +15,13 @@ from app.config import settings
 from app.db import init_db, close_db
 from app.utils.file_storage import ensure_upload_directory
 from app.routes import auth_router, interview_router, dashboard_router
-from app.routes.emotion import router as emotion_router
+from app.routes.emotion import (
+    router as emotion_router,
+    ws_router as emotion_ws_router,
+    get_executor as get_emotion_executor,
+    get_jobs as get_emotion_jobs,
+)
+from emotion_detection.runtime import describe_worker_threads
 
 
 # ============================================================================
@@ -58,6 +64,20 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         ensure_upload_directory()
         logger.info("✅ Upload directories created")
         
+        # Start emotion inference worker pool - load and warm up models
+        # now so no request pays the cold-start cost
+        try:
+            worker_info = await get_emotion_executor().warm_up()
+            for info in worker_info:
+                logger.info(
+                    f"✅ Emotion worker {info['pid']} ready: model {info['model_version']}, "
+                    f"load {info['load_seconds']}s, warm-up {info['warmup_seconds']}s, "
+                    f"{describe_worker_threads(info)}"
+                )
+        except Exception as e:
+            # Emotion analysis is optional - keep serving the rest of the API
+            logger.error(f"⚠️ Emotion workers failed to start: {str(e)}")
+        
         # TODO: Initialize AI services
         # await initialize_gemini_client()
         # await initialize_openai_client()
@@ -83,6 +103,11 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         await close_db()
         logger.info("✅ Database connections closed")
         
+        # Cancel unfinished emotion jobs, then stop the inference worker pool
+        get_emotion_jobs().shutdown()
+        get_emotion_executor().shutdown()
+        logger.info("✅ Emotion worker pool stopped")
+        
         # TODO: Close AI service connections
         # await close_ai_services()
         # logger.info("✅ AI services closed")
@@ -189,6 +214,9 @@ app.include_router(dashboard_router, prefix="/api")
 # Emotion detection routes (/api/emotion/...)
 app.include_router(emotion_router, prefix="/api")
 
+# Live emotion streaming (/ws/emotion/{interview_id})
+app.include_router(emotion_ws_router)
+
 logger.info("✅ All routers registered")
 
 
@@ -262,15 +290,36 @@ async def api_info():
 # Middleware (Optional - Add as needed)
 # ============================================================================
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
+class RequestLoggingMiddleware:
     """
     Log all incoming requests (optional).
+    
+    Written as plain ASGI middleware: @app.middleware("http") wraps every
+    response in its own StreamingResponse, which reads `receive` while the
+    endpoint may still be reading a streamed request body
+    (/api/emotion/timeline/stream) and so takes body chunks away from it.
     """
-    logger.info(f"📨 {request.method} {request.url.path}")
-    response = await call_next(request)
-    logger.info(f"✅ {request.method} {request.url.path} - Status: {response.status_code}")
-    return response
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        method, path = scope["method"], scope["path"]
+        logger.info(f"📨 {method} {path}")
+        
+        async def send_logged(message):
+            if message["type"] == "http.response.start":
+                logger.info(f"✅ {method} {path} - Status: {message['status']}")
+            await send(message)
+        
+        await self.app(scope, receive, send_logged)
+
+
+app.add_middleware(RequestLoggingMiddleware)
 
 
 # ============================================================================
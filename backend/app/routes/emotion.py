@@ -3,71 +3,556 @@ FastAPI routes for emotion detection
 Integrates with the EmotionDetector service
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from pydantic import BaseModel
-from typing import List, Dict, Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, UploadFile, File, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select, and_
+from decimal import Decimal
+from functools import partial
+from typing import Any, AsyncIterator, List, Dict, Optional, Set, Tuple, Union
+import asyncio
+import json
 import sys
 import os
+import time
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
-from emotion_detection.emotion_detector import get_emotion_detector
+from emotion_detection.labels import SENTIMENT_MAPPING
+from emotion_detection.aggregation import EmotionAggregator
+from emotion_detection.executor import EmotionExecutor, get_emotion_executor
+from emotion_detection.batcher import MicroBatcher, get_micro_batcher
+from emotion_detection.model_server import EmotionModelClient, get_model_client, local_status
+from emotion_detection.admission import AdmissionController, FrameDropped, get_admission_controller
+from emotion_detection.result_cache import ResultCache, content_key, content_keys, get_result_cache
+from emotion_detection.jobs import EmotionJob, JobQueueFull, JobStore, get_job_store
+from emotion_detection.session import EmotionSession, SessionRegistry, get_session_registry
+from emotion_detection.dedup import REDUCED_DECODE_FACTOR, decode_reduced_gray, difference_hash
+from emotion_detection.sampling import make_thumbnail
+from app.config import settings
+from app.db import AsyncSessionLocal
+from app.models import Interview, QuestionResult
+from app.utils.file_storage import get_file_path
+from app.utils.frame_stream import Frame, FrameReader, FrameStreamingResponse, iter_request_frames
 
 router = APIRouter(prefix="/emotion", tags=["emotion"])
 
-# Initialize emotion detector (lazy loading)
-emotion_detector = None
+# WebSocket routes are mounted at the application root (/ws/...)
+ws_router = APIRouter(tags=["emotion"])
+
+
+async def get_current_user_id() -> int:
+    """
+    Placeholder: Extract user ID from JWT token.
+    In production, implement proper JWT validation.
+    """
+    return 1  # Placeholder
+
+
+async def owns_interview(interview_id: int, user_id: int) -> bool:
+    """
+    Check that an interview belongs to a user
+    
+    Args:
+        interview_id: Interview ID
+        user_id: Current user ID
+        
+    Returns:
+        True if the interview exists and is the user's
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Interview.id).where(
+                and_(Interview.id == interview_id, Interview.user_id == user_id)
+            )
+        )
+        return result.scalar_one_or_none() is not None
+
+
+async def find_question_result(question_result_id: int, user_id: int) -> Optional[QuestionResult]:
+    """
+    Look up an answer of one of the user's interviews
+    
+    Args:
+        question_result_id: QuestionResult ID
+        user_id: Current user ID
+        
+    Returns:
+        The QuestionResult, or None if it does not exist or is not the user's
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(QuestionResult).join(Interview).where(
+                and_(QuestionResult.id == question_result_id, Interview.user_id == user_id)
+            )
+        )
+        return result.scalar_one_or_none()
+
+
+def warmup_batch_sizes() -> List[int]:
+    """
+    Batch sizes the model sees in production
+    
+    Micro-batches hold up to EMOTION_BATCH_MAX_SIZE frames and Keras splits
+    large timeline batches into chunks of 32, so powers of two up to the
+    larger of the two (plus the exact maximum) cover every traced shape.
+    
+    Returns:
+        Sorted list of batch sizes
+    """
+    largest = max(settings.EMOTION_BATCH_MAX_SIZE, 32)
+    sizes = {settings.EMOTION_BATCH_MAX_SIZE}
+    
+    size = 1
+    while size <= largest:
+        sizes.add(size)
+        size *= 2
+    
+    return sorted(sizes)
+
+
+def get_local_executor() -> EmotionExecutor:
+    """
+    Get the in-process emotion executor configured from app settings
+    
+    Returns:
+        EmotionExecutor instance (process pool started on first use)
+    """
+    return get_emotion_executor(
+        max_workers=settings.EMOTION_WORKERS,
+        model_path=settings.EMOTION_MODEL_PATH,
+        detector_options={
+            "detection_width": settings.EMOTION_DETECTION_WIDTH,
+            "detection_upsample": settings.EMOTION_DETECTION_UPSAMPLE,
+            "detection_model": settings.EMOTION_DETECTION_MODEL,
+            "max_frame_width": settings.EMOTION_MAX_FRAME_WIDTH,
+            "inference_backend": settings.EMOTION_INFERENCE_BACKEND,
+            "face_detector": settings.EMOTION_FACE_DETECTOR,
+            "face_detector_options": {
+                "lbp_cascade": settings.EMOTION_FACE_LBP_CASCADE or None,
+                "dnn_prototxt": settings.EMOTION_FACE_DNN_PROTOTXT or None,
+                "dnn_weights": settings.EMOTION_FACE_DNN_WEIGHTS or None,
+                "dnn_confidence": settings.EMOTION_FACE_DNN_CONFIDENCE,
+            },
+            "intra_op_threads": settings.EMOTION_INTRA_OP_THREADS,
+            "inter_op_threads": settings.EMOTION_INTER_OP_THREADS,
+        },
+        warmup_batch_sizes=warmup_batch_sizes(),
+        stage_timing=settings.EMOTION_STAGE_TIMING,
+        worker_cpus=settings.emotion_worker_cpus,
+        pin_workers=settings.EMOTION_PIN_WORKERS
+    )
+
+
+def get_local_batcher() -> MicroBatcher:
+    """
+    Get the in-process cross-request micro-batcher configured from app settings
+    
+    Returns:
+        MicroBatcher instance feeding the local emotion executor
+    """
+    return get_micro_batcher(
+        get_local_executor(),
+        max_batch_size=settings.EMOTION_BATCH_MAX_SIZE,
+        max_wait_ms=settings.EMOTION_BATCH_MAX_WAIT_MS
+    )
+
+
+def get_executor() -> Union[EmotionExecutor, EmotionModelClient]:
+    """
+    Get the emotion executor: the shared model server if EMOTION_SERVER_SOCKET
+    is set, else this process's own worker pool
+    
+    Returns:
+        EmotionModelClient or EmotionExecutor (both offer run, warm_up and shutdown)
+    """
+    if settings.EMOTION_SERVER_SOCKET:
+        return get_model_client(settings.EMOTION_SERVER_SOCKET)
+    return get_local_executor()
+
+
+def get_batcher() -> Union[MicroBatcher, EmotionModelClient]:
+    """
+    Get the micro-batcher: the shared model server's if EMOTION_SERVER_SOCKET
+    is set, else this process's own
+    
+    Returns:
+        EmotionModelClient or MicroBatcher (both offer submit and submit_tracked)
+    """
+    if settings.EMOTION_SERVER_SOCKET:
+        return get_model_client(settings.EMOTION_SERVER_SOCKET)
+    return get_local_batcher()
+
+
+async def get_status() -> Dict:
+    """
+    Get executor and batching status from wherever the models run
+    
+    Returns:
+        Status dictionary (see emotion_detection.model_server.local_status)
+    """
+    if settings.EMOTION_SERVER_SOCKET:
+        return await get_model_client(settings.EMOTION_SERVER_SOCKET).status()
+    return local_status(get_local_executor(), get_local_batcher())
+
+
+def get_sessions() -> SessionRegistry:
+    """
+    Get the live emotion session registry configured from app settings
+    
+    Returns:
+        SessionRegistry instance
+    """
+    return get_session_registry(
+        ttl_seconds=settings.EMOTION_SESSION_TTL_SECONDS,
+        redetect_interval=settings.EMOTION_REDETECT_INTERVAL,
+        dedup_distance=settings.EMOTION_DEDUP_MAX_DISTANCE,
+        dedup_window_seconds=settings.EMOTION_DEDUP_WINDOW_SECONDS,
+        dedup_cache_size=settings.EMOTION_DEDUP_CACHE_SIZE,
+        ema_alpha=settings.EMOTION_SENTIMENT_EMA_ALPHA,
+        sampling_min_rate=settings.EMOTION_SAMPLING_MIN_RATE,
+        sampling_max_rate=settings.EMOTION_SAMPLING_MAX_RATE,
+        sampling_threshold=settings.EMOTION_SAMPLING_THRESHOLD
+    )
+
+def get_admission() -> AdmissionController:
+    """
+    Get the live frame admission controller configured from app settings
+    
+    Returns:
+        AdmissionController instance
+    """
+    return get_admission_controller(
+        max_in_flight=settings.EMOTION_MAX_IN_FLIGHT,
+        max_frame_age=settings.EMOTION_MAX_FRAME_AGE_SECONDS
+    )
+
+def get_cache() -> ResultCache:
+    """
+    Get the content-hash result cache configured from app settings
+    
+    Returns:
+        ResultCache instance
+    """
+    return get_result_cache(
+        max_entries=settings.EMOTION_RESULT_CACHE_SIZE,
+        max_bytes=int(settings.EMOTION_RESULT_CACHE_MAX_MB * 1024 * 1024),
+        ttl_seconds=settings.EMOTION_RESULT_CACHE_TTL_SECONDS
+    )
+
+def get_jobs() -> JobStore:
+    """
+    Get the background emotion job store configured from app settings
+    
+    Returns:
+        JobStore instance
+    """
+    return get_job_store(
+        concurrency=settings.EMOTION_JOB_CONCURRENCY,
+        max_pending=settings.EMOTION_JOB_MAX_PENDING,
+        ttl_seconds=settings.EMOTION_JOB_TTL_SECONDS
+    )
+
+def resolve_face_detector(quality: Optional[str]) -> Optional[str]:
+    """
+    Map a request quality tier to a face detector backend
+    
+    Args:
+        quality: Quality tier from EMOTION_QUALITY_TIERS (None for the default detector)
+        
+    Returns:
+        Face detector backend name, or None for the worker default
+    """
+    if quality is None or quality == "":
+        return None
+    
+    tiers = settings.emotion_quality_tiers
+    if quality not in tiers:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown quality tier '{quality}'. Choose from: {', '.join(tiers)}"
+        )
+    
+    return tiers[quality]
+
+def inspect_frame(
+    image: Union[str, bytes],
+    with_hash: bool,
+    with_thumbnail: bool
+) -> Optional[Tuple[Tuple[int, int], Optional[int], Any]]:
+    """
+    Decode a live frame at 1/8 scale and derive what the session needs from it
+    
+    Blocking (base64 and JPEG decode, resizes); run it in a thread, off the
+    event loop.
+    
+    Args:
+        image: Base64 encoded image string or raw image bytes
+        with_hash: Compute the dHash for the near-duplicate cache
+        with_thumbnail: Compute the adaptive sampling thumbnail
+        
+    Returns:
+        Tuple of (full frame (width, height), dHash or None, thumbnail or
+        None), or None if the frame cannot be decoded
+    """
+    gray = decode_reduced_gray(image)
+    if gray is None:
+        return None
+    
+    height, width = gray.shape
+    return (
+        (width * REDUCED_DECODE_FACTOR, height * REDUCED_DECODE_FACTOR),
+        difference_hash(gray) if with_hash else None,
+        make_thumbnail(gray) if with_thumbnail else None
+    )
+
+async def analyze_session_frame(
+    session: EmotionSession,
+    image: Union[str, bytes],
+    detector: Optional[str] = None,
+    timestamp: Optional[float] = None
+) -> Tuple[List[Dict], bool]:
+    """
+    Analyze a live session frame, reusing an earlier result when possible
+    
+    The frame is decoded once at 1/8 scale in grayscale, in a thread. The
+    adaptive sampler may skip it (static scene: the last result is reused),
+    then the near-duplicate cache may answer it; otherwise it goes through
+    admission control and is analyzed.
+    
+    Args:
+        session: Live emotion session the frame belongs to
+        image: Base64 encoded image string or raw image bytes
+        detector: Face detector backend name (None for the worker default)
+        timestamp: Client timestamp of the frame in seconds
+        
+    Returns:
+        Tuple of (face results, whether an earlier result was reused)
+        
+    Raises:
+        FrameDropped: If admission control skipped the frame
+    """
+    frame_cache, sampler = session.frame_cache, session.sampler
+    inspected = None
+    if frame_cache is not None or sampler is not None:
+        inspected = await asyncio.get_running_loop().run_in_executor(
+            None, inspect_frame, image, frame_cache is not None, sampler is not None
+        )
+    frame_size, frame_hash, thumbnail = inspected or (None, None, None)
+    
+    # The sampler's reference only advances once the frame has a result, so
+    # a frame dropped by admission control does not suppress the next ones
+    sampled = None
+    if thumbnail is not None:
+        now = time.monotonic()
+        reason = sampler.check(thumbnail, now)
+        if reason is None:
+            if session.last_faces is not None:
+                sampler.skip()
+                return session.last_faces, True
+            reason = 'change'  # Nothing to reuse yet
+        sampled = (thumbnail, now, reason)
+    
+    if frame_hash is not None:
+        faces = frame_cache.lookup(frame_hash)
+        if faces is not None:
+            if sampled is not None:
+                sampler.accept(*sampled)
+            return faces, True
+    
+    async with get_admission().admit(session.frame_slot, timestamp):
+        faces, session.face_track = await get_batcher().submit_tracked(image, session.face_track, detector)
+    
+    if frame_hash is not None:
+        frame_cache.store(frame_hash, faces)
+    
+    if sampled is not None:
+        sampler.accept(*sampled)
+    
+    if thumbnail is not None:
+        sampler.track_face(faces[0]['location'] if faces else None, *frame_size)
+    
+    return faces, False
 
 class EmotionAnalysisRequest(BaseModel):
     """Request model for base64 image emotion analysis"""
     image: str
     timestamp: Optional[float] = None
+    interview_id: Optional[int] = None  # Enables live session state and face tracking
+    question_id: Optional[int] = None  # Also aggregates the frame under this question
+    quality: Optional[str] = None  # Quality tier selecting the face detector (EMOTION_QUALITY_TIERS)
 
 class EmotionAnalysisResponse(BaseModel):
     """Response model for emotion analysis"""
     success: bool
     faces: List[Dict]
     timestamp: Optional[float] = None
+    cached: bool = False  # Result reused from an identical frame, or a near-identical or static recent frame of the session
+    skipped: Optional[str] = None  # Why the frame was not analyzed (superseded or stale)
     message: Optional[str] = None
 
-@router.post("/analyze", response_model=EmotionAnalysisResponse)
-async def analyze_emotion(request: EmotionAnalysisRequest):
+def _optional_number(value: Optional[str], cast):
+    """Parse an optional query/form value, raising 422 on bad input"""
+    if value is None or value == "":
+        return None
+    try:
+        return cast(value)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid numeric value: {value}")
+
+async def read_analysis_request(
+    http_request: Request
+) -> Tuple[Union[str, bytes], Optional[float], Optional[int], Optional[int], Optional[str]]:
+    """
+    Read a frame analysis request in any supported encoding
+    
+    Supported content types:
+        - application/json: EmotionAnalysisRequest with a base64 image
+        - application/octet-stream or image/*: raw JPEG/PNG body,
+          `timestamp`, `interview_id`, `question_id` and `quality` as query parameters
+        - multipart/form-data: `image` file field plus optional
+          `timestamp`, `interview_id`, `question_id` and `quality` form fields
+    
+    Args:
+        http_request: Incoming request
+        
+    Returns:
+        Tuple of (image as base64 string or raw bytes, timestamp, interview_id,
+        question_id, quality)
+    """
+    content_type = http_request.headers.get("content-type", "")
+    
+    if content_type.startswith(("application/octet-stream", "image/")):
+        image = await http_request.body()
+        fields = http_request.query_params
+    
+    elif content_type.startswith("multipart/form-data"):
+        fields = await http_request.form()
+        upload = fields.get("image")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=422, detail="Multipart request needs an 'image' file field")
+        image = await upload.read()
+    
+    else:
+        try:
+            request = EmotionAnalysisRequest.model_validate(await http_request.json())
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid analysis request: {str(e)}")
+        return request.image, request.timestamp, request.interview_id, request.question_id, request.quality
+    
+    if not image:
+        raise HTTPException(status_code=422, detail="Empty image body")
+    
+    return (
+        image,
+        _optional_number(fields.get("timestamp"), float),
+        _optional_number(fields.get("interview_id"), int),
+        _optional_number(fields.get("question_id"), int),
+        fields.get("quality")
+    )
+
+_ANALYZE_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": EmotionAnalysisRequest.model_json_schema()
+            },
+            "application/octet-stream": {
+                "schema": {"type": "string", "format": "binary"}
+            },
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["image"],
+                    "properties": {
+                        "image": {"type": "string", "format": "binary"},
+                        "timestamp": {"type": "number"},
+                        "interview_id": {"type": "integer"},
+                        "question_id": {"type": "integer"},
+                        "quality": {"type": "string"}
+                    }
+                }
+            }
+        }
+    }
+}
+
+@router.post("/analyze", response_model=EmotionAnalysisResponse, openapi_extra=_ANALYZE_REQUEST_BODY)
+async def analyze_emotion(http_request: Request, user_id: int = Depends(get_current_user_id)):
     """
-    Analyze emotion from base64 encoded image
+    Analyze emotion from a single image
+    
+    Accepts a JSON body with a base64 image, or the raw JPEG/PNG bytes
+    (application/octet-stream or multipart) which skips base64 inflation
+    and is decoded once straight into the detector's layout. An optional
+    `quality` tier picks the face detector (e.g. "fast" or "accurate").
+    
+    Under load, frames are refused with 429 when too many are in analysis,
+    and live session frames come back with `skipped` when a newer frame of
+    the same session supersedes them or they miss their deadline.
     
     Args:
-        request: EmotionAnalysisRequest with base64 image
+        http_request: Request carrying an EmotionAnalysisRequest or raw image
+        user_id: Current user ID; `interview_id` must be one of the user's interviews
         
     Returns:
         EmotionAnalysisResponse with detected faces and emotions
     """
-    global emotion_detector
+    image, timestamp, interview_id, question_id, quality = await read_analysis_request(http_request)
+    detector = resolve_face_detector(quality)
+    
+    if interview_id is not None and not await owns_interview(interview_id, user_id):
+        raise HTTPException(status_code=404, detail="Interview not found")
     
     try:
-        # Initialize detector on first use
-        if emotion_detector is None:
-            model_path = os.path.join(
-                os.path.dirname(__file__),
-                "..",
-                "emotion_detection",
-                "emotion_model.h5"
-            )
-            
-            # Only load weights if model file exists
-            if os.path.exists(model_path):
-                emotion_detector = get_emotion_detector(model_path)
-            else:
-                print("Warning: Model weights not found. Using untrained model.")
-                emotion_detector = get_emotion_detector()
+        # Byte-identical resubmissions (retries) are answered from the result
+        # cache; the frame is decoded and hashed for its key in a thread.
+        # Nothing is cached until the model version is known.
+        cache = get_cache()
+        model_version = get_executor().model_version
+        key = await asyncio.get_running_loop().run_in_executor(
+            None, content_key, image, model_version, detector
+        ) if cache.enabled and model_version is not None else None
+        results = cache.get(key) if key is not None else None
+        cached = results is not None
+        
+        # Otherwise batch with concurrent requests and analyze in the emotion worker pool
+        if interview_id is not None:
+            session = get_sessions().get(interview_id)
+            if results is None:
+                results, cached = await analyze_session_frame(session, image, detector, timestamp)
+            session.update(results, timestamp, cached, question_id)
+        elif results is None:
+            async with get_admission().admit():
+                results = await get_batcher().submit(image, detector)
         
-        # Analyze image
-        results = emotion_detector.analyze_base64_image(request.image)
+        if key is not None and not cached and get_executor().model_version == model_version:
+            cache.put(key, results)
         
         return EmotionAnalysisResponse(
             success=True,
             faces=results,
-            timestamp=request.timestamp
+            timestamp=timestamp,
+            cached=cached
+        )
+    
+    except FrameDropped as e:
+        if e.reason == 'shed':
+            raise HTTPException(
+                status_code=429,
+                detail="Emotion analysis is at capacity, frame skipped",
+                headers={"Retry-After": "1"}
+            )
+        
+        # A newer frame of the session is already queued or this one is too late
+        return EmotionAnalysisResponse(
+            success=True,
+            faces=[],
+            timestamp=timestamp,
+            skipped=e.reason,
+            message=str(e)
         )
     
     except Exception as e:
@@ -85,18 +570,60 @@ async def health_check():
     Returns:
         Status information
     """
-    global emotion_detector
+    status = await get_status()
     
     return {
         "status": "healthy",
         "service": "emotion_detection",
-        "model_loaded": emotion_detector is not None
+        "model_server": settings.EMOTION_SERVER_SOCKET or None,
+        "model_loaded": status["running"],
+        "model": status["model"],
+        "preferred_capture": {
+            "width": settings.EMOTION_MAX_FRAME_WIDTH,
+            "height": settings.EMOTION_MAX_FRAME_HEIGHT,
+            "format": "image/jpeg"
+        },
+        "executor": status["executor"],
+        "batching": status["batching"],
+        "stages": status["stages"],
+        "admission": get_admission().stats(),
+        "result_cache": get_cache().stats(),
+        "jobs": get_jobs().stats(),
+        "live_sessions": len(get_sessions()),
+        "dedup": get_sessions().dedup_stats()
     }
 
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """
+    Pipeline metrics in the Prometheus text exposition format
+    
+    Per-stage latency histograms (decode, color, detect, preprocess, infer,
+    postprocess) with p50/p95/p99 estimates, faces per frame and frames/sec,
+    merged from all emotion workers, plus admission and drop counters.
+    
+    Returns:
+        Prometheus text format (version 0.0.4)
+    """
+    if settings.EMOTION_SERVER_SOCKET:
+        text = await get_model_client(settings.EMOTION_SERVER_SOCKET).render_prometheus()
+    else:
+        text = get_local_executor().metrics.render_prometheus()
+    text += get_admission().render_prometheus()
+    text += get_cache().render_prometheus()
+    text += get_jobs().render_prometheus()
+    
+    return PlainTextResponse(
+        text,
+        media_type="text/plain; version=0.0.4"
+    )
+
 class EmotionTimelineRequest(BaseModel):
     """Request model for analyzing emotion timeline"""
     images: List[str]
     timestamps: List[float]
+    interview_id: Optional[int] = None  # Also feed the frames into the live session
+    question_id: Optional[int] = None
 
 class EmotionTimelineResponse(BaseModel):
     """Response model for emotion timeline"""
@@ -106,59 +633,46 @@ class EmotionTimelineResponse(BaseModel):
     message: Optional[str] = None
 
 @router.post("/timeline", response_model=EmotionTimelineResponse)
-async def analyze_emotion_timeline(request: EmotionTimelineRequest):
+async def analyze_emotion_timeline(
+    request: EmotionTimelineRequest,
+    user_id: int = Depends(get_current_user_id)
+):
     """
     Analyze emotions across multiple frames to create timeline
     
+    For long recordings prefer POST /emotion/timeline/stream, which does
+    not hold the whole upload in memory, or POST /emotion/jobs, which
+    does not hold the connection while the frames are analyzed.
+    
     Args:
         request: EmotionTimelineRequest with list of images and timestamps
+        user_id: Current user ID; `interview_id` must be one of the user's interviews
         
     Returns:
         EmotionTimelineResponse with timeline data and summary
     """
-    global emotion_detector
+    if request.interview_id is not None and not await owns_interview(request.interview_id, user_id):
+        raise HTTPException(status_code=404, detail="Interview not found")
     
     try:
-        # Initialize detector on first use
-        if emotion_detector is None:
-            emotion_detector = get_emotion_detector()
-        
         timeline = []
-        emotion_counts = {label: 0 for label in emotion_detector.emotion_labels}
-        sentiment_scores = []
+        aggregator = EmotionAggregator(settings.EMOTION_SENTIMENT_EMA_ALPHA)
+        session = get_sessions().get(request.interview_id) if request.interview_id is not None else None
+        
+        frame_results = await analyze_images_cached(request.images)
         
-        # Analyze each frame
-        for image, timestamp in zip(request.images, request.timestamps):
-            results = emotion_detector.analyze_base64_image(image)
+        for results, timestamp in zip(frame_results, request.timestamps):
+            aggregator.update_faces(results, timestamp)
+            if session is not None:
+                session.update(results, timestamp, question_id=request.question_id)
             
             # Get primary emotion from first detected face
-            if results:
-                primary_emotion = results[0]['emotion']
-                confidence = results[0]['confidence']
-                sentiment = emotion_detector.get_sentiment_score(primary_emotion)
-                
-                timeline.append({
-                    'timestamp': timestamp,
-                    'emotion': primary_emotion,
-                    'confidence': confidence,
-                    'sentiment': sentiment,
-                    'face_count': len(results)
-                })
-                
-                emotion_counts[primary_emotion] += 1
-                sentiment_scores.append(sentiment)
-        
-        # Calculate summary statistics
-        dominant_emotion = max(emotion_counts.items(), key=lambda x: x[1])[0]
-        avg_sentiment = sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0.0
-        
-        summary = {
-            'dominant_emotion': dominant_emotion,
-            'emotion_distribution': emotion_counts,
-            'average_sentiment': avg_sentiment,
-            'total_frames': len(request.images),
-            'frames_with_faces': len(timeline)
-        }
+            entry = timeline_entry(results, timestamp)
+            if entry is not None:
+                timeline.append(entry)
+        
+        summary = aggregator.snapshot()
+        summary['track'] = aggregator.track()
         
         return EmotionTimelineResponse(
             success=True,
@@ -172,3 +686,609 @@ async def analyze_emotion_timeline(request: EmotionTimelineRequest):
             status_code=500,
             detail=f"Failed to analyze emotion timeline: {str(e)}"
         )
+
+async def analyze_images_cached(images: List[str]) -> List[List[Dict]]:
+    """
+    Analyze base64 frames, reusing cached results of identical frames
+    
+    Frames missing from the result cache are analyzed with a single
+    batched model call in the worker pool. The frames are decoded and
+    hashed for their cache keys in a thread, off the event loop. Nothing
+    is cached while the model version is unknown (before warm-up).
+    
+    Args:
+        images: Base64 encoded images
+        
+    Returns:
+        Face results per image
+    """
+    cache = get_cache()
+    model_version = get_executor().model_version
+    if cache.enabled and model_version is not None:
+        keys = await asyncio.get_running_loop().run_in_executor(
+            None, partial(content_keys, images, model_version, None)
+        )
+    else:
+        keys = [None] * len(images)
+    frame_results = [cache.get(key) if key is not None else None for key in keys]
+    missing = [index for index, results in enumerate(frame_results) if results is None]
+    
+    if missing:
+        analyzed = await get_executor().run(
+            'analyze_base64_images',
+            [images[index] for index in missing]
+        )
+        # Results of a model swapped mid-call must not land under the old version
+        current = get_executor().model_version == model_version
+        for index, results in zip(missing, analyzed):
+            frame_results[index] = results
+            if keys[index] is not None and current:
+                cache.put(keys[index], results)
+    
+    return frame_results
+
+def timeline_entry(results: List[Dict], timestamp: float) -> Optional[Dict]:
+    """
+    Build the timeline entry of one analyzed frame
+    
+    Args:
+        results: Face results for the frame
+        timestamp: Frame timestamp in seconds
+        
+    Returns:
+        Entry for the primary (first) face, or None if no face was found
+    """
+    if not results:
+        return None
+    
+    primary_emotion = results[0]['emotion']
+    
+    return {
+        'timestamp': timestamp,
+        'emotion': primary_emotion,
+        'confidence': results[0]['confidence'],
+        'sentiment': SENTIMENT_MAPPING.get(primary_emotion, 0.0),
+        'face_count': len(results)
+    }
+
+async def stream_timeline(
+    frames: AsyncIterator[Frame],
+    session: Optional[EmotionSession] = None,
+    question_id: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Analyze streamed frames window by window and emit NDJSON lines
+    
+    Frames are analyzed in windows of EMOTION_BATCH_MAX_SIZE. While one
+    window is in the worker pool the next one is read, so at most two
+    windows of frames are held regardless of the upload length.
+    
+    Args:
+        frames: Async iterator of (timestamp, image) tuples
+        session: Live session to also feed the frames into
+        question_id: Question the frames belong to
+        
+    Yields:
+        NDJSON lines: one timeline entry per frame with a face, then
+        {"summary": ...}; {"error": ...} ends the stream early
+    """
+    aggregator = EmotionAggregator(settings.EMOTION_SENTIMENT_EMA_ALPHA)
+    window_size = max(1, settings.EMOTION_BATCH_MAX_SIZE)
+    window: List = []
+    timestamps: List[float] = []
+    running: Optional[Tuple[asyncio.Future, List[float]]] = None
+    
+    async def finish(analysis: asyncio.Future, analysis_timestamps: List[float]) -> List[bytes]:
+        lines = []
+        for results, timestamp in zip(await analysis, analysis_timestamps):
+            aggregator.update_faces(results, timestamp)
+            if session is not None:
+                session.update(results, timestamp, question_id=question_id)
+            
+            entry = timeline_entry(results, timestamp)
+            if entry is not None:
+                lines.append(json.dumps(entry).encode() + b"\n")
+        return lines
+    
+    try:
+        async for timestamp, image in frames:
+            window.append(image)
+            timestamps.append(timestamp)
+            if len(window) < window_size:
+                continue
+            
+            if running is not None:
+                for line in await finish(*running):
+                    yield line
+            running = (asyncio.ensure_future(get_executor().run('analyze_images', window)), timestamps)
+            window, timestamps = [], []
+        
+        if running is not None:
+            for line in await finish(*running):
+                yield line
+            running = None
+        if window:
+            for line in await finish(asyncio.ensure_future(get_executor().run('analyze_images', window)), timestamps):
+                yield line
+        
+        summary = aggregator.snapshot()
+        summary['track'] = aggregator.track()
+        yield json.dumps({"summary": summary}).encode() + b"\n"
+    
+    except Exception as e:
+        print(f"Error streaming emotion timeline: {e}")
+        yield json.dumps({"error": str(e)}).encode() + b"\n"
+    
+    finally:
+        # Client went away mid-stream - do not leave the window running
+        if running is not None and not running[0].done():
+            running[0].cancel()
+
+@router.post("/timeline/stream")
+async def stream_emotion_timeline(
+    http_request: Request,
+    interview_id: Optional[int] = None,
+    question_id: Optional[int] = None,
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Analyze a long frame sequence as it is uploaded
+    
+    Accepts application/x-ndjson (one {"image": base64, "timestamp": s}
+    object per line) or multipart/form-data (a `timestamp` field before
+    each `image` file part). Results are streamed back as NDJSON: one
+    timeline entry per frame with a face, then a final {"summary": ...}
+    line in the /emotion/timeline summary format. Peak memory does not
+    grow with the number of frames.
+    
+    Args:
+        http_request: Streaming request
+        interview_id: Also feed the frames into this live session
+        question_id: Question the frames belong to
+        user_id: Current user ID; `interview_id` must be one of the user's interviews
+        
+    Returns:
+        StreamingResponse of NDJSON lines
+    """
+    if interview_id is not None and not await owns_interview(interview_id, user_id):
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    frames = iter_request_frames(http_request)
+    session = get_sessions().get(interview_id) if interview_id is not None else None
+    
+    # Reading starts now, in its own task, and keeps the request body to
+    # itself until it is consumed (see FrameStreamingResponse)
+    reader = FrameReader(frames, max(1, settings.EMOTION_BATCH_MAX_SIZE))
+    
+    return FrameStreamingResponse(
+        stream_timeline(reader, session, question_id),
+        reader,
+        media_type="application/x-ndjson"
+    )
+
+async def analyze_answer_video(question_result_id: int) -> Optional[Dict]:
+    """
+    Analyze the recorded video of an answer and store its emotion summary
+    
+    Meant to run as a background task after upload: frames are sampled
+    lazily in an emotion worker and analyzed in batches, then the dominant
+    emotion and its mean confidence (0-100) are written to the QuestionResult.
+    
+    Args:
+        question_result_id: QuestionResult whose video_file_path to analyze
+        
+    Returns:
+        Emotion summary of the video, or None if there was nothing to analyze
+    """
+    async with AsyncSessionLocal() as db:
+        question = await db.get(QuestionResult, question_result_id)
+        if question is None or not question.video_file_path:
+            return None
+        
+        try:
+            summary = await get_executor().run(
+                'analyze_video',
+                str(get_file_path(question.video_file_path)),
+                settings.EMOTION_VIDEO_SAMPLE_FPS,
+                settings.EMOTION_BATCH_MAX_SIZE,
+                settings.EMOTION_REDETECT_INTERVAL,
+                (
+                    settings.EMOTION_SAMPLING_MIN_RATE,
+                    settings.EMOTION_SAMPLING_MAX_RATE,
+                    settings.EMOTION_SAMPLING_THRESHOLD
+                ) if settings.EMOTION_SAMPLING_MIN_RATE > 0 else None
+            )
+        except Exception as e:
+            print(f"Error analyzing answer video {question.video_file_path}: {e}")
+            return None
+        
+        if summary['frames_with_faces']:
+            question.emotion_detected = summary['dominant_emotion']
+            question.confidence_level = Decimal(str(round(summary['average_confidence'] * 100, 2)))
+            await db.commit()
+        
+        return summary
+
+@router.post("/video/{question_result_id}", status_code=202)
+async def queue_video_analysis(
+    question_result_id: int,
+    background_tasks: BackgroundTasks,
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Queue emotion analysis of an answer's stored video
+    
+    Args:
+        question_result_id: QuestionResult with a saved video
+        background_tasks: FastAPI background tasks
+        user_id: Current user ID
+        
+    Returns:
+        Acknowledgement; results are written to the QuestionResult
+    """
+    question = await find_question_result(question_result_id, user_id)
+    
+    if question is None or not question.video_file_path:
+        raise HTTPException(status_code=404, detail="No recorded video for this answer")
+    
+    background_tasks.add_task(analyze_answer_video, question_result_id)
+    
+    return {"success": True, "message": "Video emotion analysis queued"}
+
+class EmotionJobRequest(BaseModel):
+    """Request model for a background emotion job: frames or a recorded answer video"""
+    images: Optional[List[str]] = None
+    timestamps: Optional[List[float]] = None
+    question_result_id: Optional[int] = None  # Analyze this answer's stored video instead of frames
+    interview_id: Optional[int] = None  # Also feed the frames into the live session
+    question_id: Optional[int] = None
+
+async def run_timeline_job(
+    job: EmotionJob,
+    images: List[str],
+    timestamps: List[float],
+    session: Optional[EmotionSession] = None,
+    question_id: Optional[int] = None
+) -> Dict:
+    """
+    Analyze the frames of a timeline job window by window
+    
+    Each window of EMOTION_BATCH_MAX_SIZE frames is one batched call in the
+    worker pool, after which the job's progress is updated.
+    
+    Args:
+        job: Job to report progress on
+        images: Base64 encoded images
+        timestamps: Frame timestamps in seconds
+        session: Live session to also feed the frames into
+        question_id: Question the frames belong to
+        
+    Returns:
+        {"timeline": [...], "summary": {...}} as returned by /emotion/timeline
+    """
+    timeline = []
+    aggregator = EmotionAggregator(settings.EMOTION_SENTIMENT_EMA_ALPHA)
+    window_size = max(1, settings.EMOTION_BATCH_MAX_SIZE)
+    
+    for start in range(0, len(images), window_size):
+        window_results = await analyze_images_cached(images[start:start + window_size])
+        
+        for results, timestamp in zip(window_results, timestamps[start:start + window_size]):
+            aggregator.update_faces(results, timestamp)
+            if session is not None:
+                session.update(results, timestamp, question_id=question_id)
+            
+            entry = timeline_entry(results, timestamp)
+            if entry is not None:
+                timeline.append(entry)
+        
+        job.progress(start + len(window_results))
+    
+    summary = aggregator.snapshot()
+    summary['track'] = aggregator.track()
+    
+    return {"timeline": timeline, "summary": summary}
+
+async def run_video_job(job: EmotionJob, question_result_id: int) -> Dict:
+    """
+    Analyze a stored answer video as a job
+    
+    Args:
+        job: Job being run
+        question_result_id: QuestionResult whose video to analyze
+        
+    Returns:
+        {"summary": {...}} with the video emotion summary
+    """
+    summary = await analyze_answer_video(question_result_id)
+    if summary is None:
+        raise ValueError("Video could not be analyzed")
+    
+    return {"summary": summary}
+
+@router.post("/jobs", status_code=202)
+async def create_emotion_job(
+    request: EmotionJobRequest,
+    http_request: Request,
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Start a background emotion analysis job
+    
+    Send either `images` with `timestamps` (as for /emotion/timeline) or the
+    `question_result_id` of a recorded answer video. The job id is returned
+    at once; poll GET /emotion/jobs/{job_id} or follow
+    GET /emotion/jobs/{job_id}/events for progress and the result.
+    
+    Args:
+        request: EmotionJobRequest with frames or a video reference
+        http_request: Incoming request (for the job URLs)
+        user_id: Current user ID; only this user can poll or follow the job
+        
+    Returns:
+        Job id, status and the URLs to poll or stream
+    """
+    jobs = get_jobs()
+    
+    if request.question_result_id is not None:
+        if request.images:
+            raise HTTPException(status_code=422, detail="Send either images or question_result_id, not both")
+        
+        question = await find_question_result(request.question_result_id, user_id)
+        if question is None or not question.video_file_path:
+            raise HTTPException(status_code=404, detail="No recorded video for this answer")
+        
+        kind, total = "video", None
+        work = partial(run_video_job, question_result_id=request.question_result_id)
+    
+    else:
+        images = request.images or []
+        timestamps = request.timestamps or []
+        if not images:
+            raise HTTPException(status_code=422, detail="Send images with timestamps, or question_result_id")
+        if len(images) != len(timestamps):
+            raise HTTPException(status_code=422, detail="images and timestamps must have the same length")
+        if request.interview_id is not None and not await owns_interview(request.interview_id, user_id):
+            raise HTTPException(status_code=404, detail="Interview not found")
+        
+        session = get_sessions().get(request.interview_id) if request.interview_id is not None else None
+        kind, total = "frames", len(images)
+        work = partial(
+            run_timeline_job,
+            images=images,
+            timestamps=timestamps,
+            session=session,
+            question_id=request.question_id
+        )
+    
+    try:
+        job = jobs.submit(kind, work, total, owner=user_id)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    
+    return {
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "status_url": str(http_request.url_for("get_emotion_job", job_id=job.id)),
+        "events_url": str(http_request.url_for("emotion_job_events", job_id=job.id))
+    }
+
+def find_job(job_id: str, user_id: int) -> EmotionJob:
+    """
+    Look up a job of the user or fail with 404
+    
+    Args:
+        job_id: Job id from POST /emotion/jobs
+        user_id: Current user ID
+        
+    Returns:
+        The job
+    """
+    job = get_jobs().get(job_id)
+    if job is None or job.owner != user_id:
+        raise HTTPException(status_code=404, detail="Unknown or expired emotion job")
+    
+    return job
+
+@router.get("/jobs/{job_id}")
+async def get_emotion_job(job_id: str, user_id: int = Depends(get_current_user_id)):
+    """
+    Poll a background emotion job
+    
+    Finished results are kept for EMOTION_JOB_TTL_SECONDS and encoded once,
+    so repeated polls are cheap.
+    
+    Args:
+        job_id: Job id from POST /emotion/jobs
+        user_id: Current user ID (jobs of other users are 404)
+        
+    Returns:
+        Job status and progress, plus `result` (same fields as
+        /emotion/timeline, or the video summary) or `error` once finished
+    """
+    return Response(find_job(job_id, user_id).render(), media_type="application/json")
+
+@router.get("/jobs/{job_id}/events")
+async def emotion_job_events(job_id: str, user_id: int = Depends(get_current_user_id)):
+    """
+    Follow a background emotion job as Server-Sent Events
+    
+    Emits a `progress` event on every state change and ends with a `done`
+    or `failed` event carrying the same body as GET /emotion/jobs/{job_id}.
+    
+    Args:
+        job_id: Job id from POST /emotion/jobs
+        user_id: Current user ID (jobs of other users are 404)
+        
+    Returns:
+        StreamingResponse of text/event-stream
+    """
+    job = find_job(job_id, user_id)
+    
+    async def events() -> AsyncIterator[bytes]:
+        async for update in job.changes():
+            if update is None:
+                yield b": keepalive\n\n"
+            else:
+                event = job.status if job.finished else "progress"
+                yield b"event: " + event.encode() + b"\ndata: " + job.render() + b"\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+@router.get("/summary/{interview_id}")
+async def emotion_summary(
+    interview_id: int,
+    question_id: Optional[int] = None,
+    since: Optional[int] = None,
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Get the running emotion summary of a live interview
+    
+    The summary is kept incrementally as frames arrive from any ingestion
+    path, so reading it costs the same however long the interview is.
+    
+    Args:
+        interview_id: Interview ID
+        question_id: Summarize only this question
+        since: Also return the run-length encoded emotion track from this segment index
+        user_id: Current user ID
+        
+    Returns:
+        Summary dictionary (plus `track` when `since` is given)
+    """
+    if not await owns_interview(interview_id, user_id):
+        raise HTTPException(status_code=404, detail="Interview not found")
+    
+    session = get_sessions().find(interview_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="No live emotion session for this interview")
+    
+    summary = session.summary(question_id)
+    
+    if since is not None:
+        aggregator = session.aggregator if question_id is None else session.question(question_id)
+        summary['track'] = aggregator.track(since)
+    
+    return {"success": True, "summary": summary}
+
+@ws_router.websocket("/ws/emotion/{interview_id}")
+async def emotion_stream(
+    websocket: WebSocket,
+    interview_id: int,
+    question_id: Optional[int] = None,
+    quality: Optional[str] = None,
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Stream webcam frames for live emotion analysis
+    
+    Protocol:
+        - Client sends each frame as a binary message (raw JPEG/PNG bytes)
+        - Server replies with a compact JSON result per frame:
+          {"seq", "t", "n" (face count), "e" (emotion), "c" (confidence),
+           "s" (sentiment), "box" ([top, right, bottom, left])}
+          "seq" numbers the frames in the order they were received on this
+          connection (from 1) and is echoed in every reply to the frame.
+          Emotion fields are omitted when no face is found; "cached": true
+          marks a result reused from a near-identical recent frame or, in a
+          static scene, from the last analyzed frame.
+        - Frames are analyzed one at a time per session; a frame arriving
+          while another waits replaces it. Replaced or late frames are
+          answered with {"seq", "skipped": "superseded" | "stale"}, and
+          {"seq", "skipped": "shed"} means the service is at capacity;
+          a failed frame is answered with {"seq", "error"}.
+        - A text message "summary" returns the running session summary
+        - A text message "question:<id>" attributes the following frames to
+          that question; "summary:<id>" returns that question's summary
+    
+    Args:
+        websocket: WebSocket connection
+        interview_id: Interview the frames belong to
+        question_id: Question the first frames belong to (query parameter)
+        quality: Quality tier selecting the face detector (query parameter)
+        user_id: Current user ID; other users' interviews are refused
+    """
+    try:
+        detector = resolve_face_detector(quality)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+    
+    if not await owns_interview(interview_id, user_id):
+        await websocket.close(code=1008, reason="Interview not found")
+        return
+    
+    await websocket.accept()
+    
+    session = get_sessions().get(interview_id)
+    if question_id is not None:
+        session.question_id = question_id
+    
+    send_lock = asyncio.Lock()
+    frame_tasks: Set[asyncio.Task] = set()
+    
+    async def send(payload: Dict):
+        async with send_lock:
+            await websocket.send_json(payload)
+    
+    async def process_frame(frame: bytes, seq: int):
+        try:
+            faces, cached = await analyze_session_frame(session, frame, detector)
+        except FrameDropped as e:
+            await send({"seq": seq, "skipped": e.reason})
+            return
+        except Exception as e:
+            print(f"Error analyzing streamed frame: {e}")
+            await send({"seq": seq, "error": str(e)})
+            return
+        
+        result = session.update(faces, cached=cached)
+        result["seq"] = seq
+        await send(result)
+    
+    received = 0
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            if message.get("bytes"):
+                # Keep reading while frames are analyzed, so a backlog is
+                # resolved by admission control instead of the socket buffer
+                received += 1
+                task = asyncio.ensure_future(process_frame(message["bytes"], received))
+                frame_tasks.add(task)
+                task.add_done_callback(frame_tasks.discard)
+            
+            elif message.get("text"):
+                command, _, argument = message["text"].partition(":")
+                try:
+                    target = int(argument) if argument else None
+                except ValueError:
+                    await send({"error": f"Invalid question id: {argument}"})
+                    continue
+                
+                if command == "summary":
+                    await send({"summary": session.summary(target)})
+                elif command == "question" and target is not None:
+                    session.question_id = target
+    
+    except WebSocketDisconnect:
+        pass
+    
+    finally:
+        for task in frame_tasks:
+            task.cancel()
@@ -3,7 +3,7 @@ Interview Routes
 Endpoints for managing interview sessions, questions, and responses
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from datetime import datetime
@@ -20,6 +20,7 @@ from app.schemas import (
     MessageResponse
 )
 from app.utils.file_storage import save_audio_file, save_video_file
+from app.routes.emotion import analyze_answer_video
 
 
 # Create router
@@ -435,6 +436,75 @@ async def submit_audio_answer(
     return question
 
 
+@router.post("/{interview_id}/questions/{question_id}/submit-video", response_model=QuestionResultResponse)
+async def submit_video_answer(
+    interview_id: int,
+    question_id: int,
+    background_tasks: BackgroundTasks,
+    video_file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    user_id: int = Depends(get_current_user_id)
+):
+    """
+    Submit a recorded video answer for a question.
+    
+    **Parameters:**
+    - **interview_id**: Interview ID
+    - **question_id**: Question ID
+    - **video_file**: Video file (mp4, webm, mov)
+    
+    **Returns:**
+    - Updated question result with video file path
+    
+    **Process:**
+    1. Save video file to storage
+    2. Queue background emotion analysis of the video; the dominant
+       emotion and its confidence are stored on the question result
+       when it finishes
+    
+    **Raises:**
+    - **404**: Interview or question not found
+    - **415**: Unsupported video format
+    - **413**: File too large
+    """
+    
+    # Verify question belongs to interview and user
+    result = await db.execute(
+        select(QuestionResult)
+        .join(Interview)
+        .where(
+            and_(
+                QuestionResult.id == question_id,
+                QuestionResult.interview_id == interview_id,
+                Interview.user_id == user_id
+            )
+        )
+    )
+    question = result.scalar_one_or_none()
+    
+    if not question:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Question not found"
+        )
+    
+    # Save video file
+    file_path, file_size = await save_video_file(video_file, user_id)
+    
+    # Update question with video path
+    question.video_file_path = file_path
+    question.answered_at = datetime.utcnow()
+    question.updated_at = datetime.utcnow()
+    
+    await db.commit()
+    await db.refresh(question)
+    
+    # Emotion analysis runs after the response is sent
+    background_tasks.add_task(analyze_answer_video, question.id)
+    
+    return question
+
+
 @router.post("/{interview_id}/questions/{question_id}/submit-text", response_model=QuestionResultResponse)
 async def submit_text_answer(
     interview_id: int,
@@ -0,0 +1,240 @@
+"""
+Frame Stream Utilities
+Incremental readers for streamed frame uploads (NDJSON or multipart), so a
+long recording is processed frame by frame instead of parsed as one body
+"""
+
+import asyncio
+import json
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from multipart.multipart import MultipartParser, parse_options_header
+
+# (timestamp in seconds, base64 string or raw image bytes)
+Frame = Tuple[float, Union[str, bytes]]
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/ndjson")
+
+# Queued by FrameReader after the last frame
+_END_OF_FRAMES = object()
+
+
+def iter_request_frames(request: Request) -> AsyncIterator[Frame]:
+    """
+    Pick the frame reader for a streamed upload
+
+    Args:
+        request: Incoming request with an NDJSON or multipart body
+
+    Returns:
+        Async iterator of (timestamp, image) tuples
+
+    Raises:
+        HTTPException: 415 for unsupported content types
+    """
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith(NDJSON_CONTENT_TYPES):
+        return read_ndjson_frames(request)
+
+    if content_type.startswith("multipart/form-data"):
+        _, options = parse_options_header(content_type)
+        boundary = options.get(b"boundary")
+        if not boundary:
+            raise HTTPException(status_code=400, detail="Multipart request without boundary")
+        return read_multipart_frames(request, boundary)
+
+    raise HTTPException(
+        status_code=415,
+        detail="Streamed frames must be application/x-ndjson or multipart/form-data"
+    )
+
+
+async def read_ndjson_frames(request: Request) -> AsyncIterator[Frame]:
+    """
+    Read frames from an NDJSON body as it arrives
+
+    Each line is {"image": "<base64>", "timestamp": <seconds>}; only the
+    line being received is buffered.
+
+    Args:
+        request: Incoming request
+
+    Yields:
+        (timestamp, base64 image) tuples
+
+    Raises:
+        ValueError: On a malformed line
+    """
+    buffer = bytearray()
+    line_number = 0
+
+    async for chunk in request.stream():
+        buffer.extend(chunk)
+
+        newline = buffer.find(b"\n")
+        while newline >= 0:
+            line, buffer = bytes(buffer[:newline]), buffer[newline + 1:]
+            line_number += 1
+            if line.strip():
+                yield _parse_ndjson_line(line, line_number)
+            newline = buffer.find(b"\n")
+
+    if buffer.strip():
+        yield _parse_ndjson_line(bytes(buffer), line_number + 1)
+
+
+def _parse_ndjson_line(line: bytes, line_number: int) -> Frame:
+    """Parse one NDJSON frame line"""
+    try:
+        item = json.loads(line)
+        return float(item["timestamp"]), item["image"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"Line {line_number}: expected {{\"image\": ..., \"timestamp\": ...}}")
+
+
+async def read_multipart_frames(request: Request, boundary: bytes) -> AsyncIterator[Frame]:
+    """
+    Read frames from a multipart body as it arrives
+
+    Each frame is a `timestamp` field followed by an `image` file part;
+    only the part being received is buffered.
+
+    Args:
+        request: Incoming request
+        boundary: Multipart boundary from the content type
+
+    Yields:
+        (timestamp, raw image bytes) tuples
+
+    Raises:
+        ValueError: If an image part has no preceding timestamp
+    """
+    parts: List[Tuple[bytes, bytes]] = []
+    state = {"header_field": b"", "header_value": b"", "name": b"", "data": bytearray()}
+
+    def on_part_begin():
+        state["name"], state["data"] = b"", bytearray()
+
+    def on_header_field(data: bytes, start: int, end: int):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        if state["header_field"].lower() == b"content-disposition":
+            _, options = parse_options_header(state["header_value"])
+            state["name"] = options.get(b"name", b"")
+        state["header_field"], state["header_value"] = b"", b""
+
+    def on_part_data(data: bytes, start: int, end: int):
+        state["data"].extend(data[start:end])
+
+    def on_part_end():
+        parts.append((state["name"], bytes(state["data"])))
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    timestamp: Optional[float] = None
+
+    async for chunk in request.stream():
+        parser.write(chunk)
+
+        for name, data in parts:
+            if name == b"timestamp":
+                timestamp = float(data)
+            elif name == b"image":
+                if timestamp is None:
+                    raise ValueError("Each image part must follow a timestamp field")
+                yield timestamp, data
+                timestamp = None
+        parts.clear()
+
+    parser.finalize()
+
+
+class FrameReader:
+    """
+    Reads the frames of an upload in a background task.
+
+    The task is started by the endpoint, before the response is returned,
+    and reads the request body into a bounded queue, so upload and analysis
+    overlap while at most `max_buffered` frames wait in memory. Iterating
+    the reader yields the frames and re-raises a read error (malformed
+    frame, client disconnect) where it occurred.
+    """
+
+    def __init__(self, frames: AsyncIterator[Frame], max_buffered: int):
+        """
+        Args:
+            frames: Frame iterator of the request (see iter_request_frames)
+            max_buffered: Frames read ahead of the consumer
+        """
+        self._queue: asyncio.Queue = asyncio.Queue(max(1, max_buffered))
+        self.task = asyncio.ensure_future(self._read(frames))
+
+    async def _read(self, frames: AsyncIterator[Frame]) -> None:
+        """Move frames into the queue, then the end marker or the error"""
+        try:
+            async for frame in frames:
+                await self._queue.put(frame)
+        except Exception as e:
+            await self._queue.put(e)
+        else:
+            await self._queue.put(_END_OF_FRAMES)
+
+    async def __aiter__(self) -> AsyncIterator[Frame]:
+        while True:
+            item = await self._queue.get()
+            if item is _END_OF_FRAMES:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def cancel(self) -> None:
+        """Stop reading, e.g. when the client went away"""
+        self.task.cancel()
+
+
+class FrameStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for endpoints that respond while still reading the
+    request body.
+
+    A plain StreamingResponse listens for the client disconnect by calling
+    `receive` during the whole response, which takes the remaining
+    http.request messages away from the request stream. Here the frame
+    reader owns `receive` until the body is read; only then is the
+    disconnect listened for. The reader is cancelled when the response ends.
+    """
+
+    def __init__(self, content: AsyncIterator[bytes], reader: FrameReader, **kwargs):
+        """
+        Args:
+            content: Response body iterator
+            reader: Reader of the request body the content is built from
+            **kwargs: StreamingResponse arguments (status_code, media_type, ...)
+        """
+        super().__init__(content, **kwargs)
+        self.reader = reader
+
+    async def listen_for_disconnect(self, receive) -> None:
+        await asyncio.wait([self.reader.task])
+        await super().listen_for_disconnect(receive)
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.reader.cancel()
@@ -4,7 +4,19 @@ Real-time facial emotion detection using CNN
 Based on: https://github.com/priya-dwivedi/face_and_emotion_detection
 """
 
-from .emotion_detector import EmotionDetector, get_emotion_detector
-
 __all__ = ['EmotionDetector', 'get_emotion_detector']
 __version__ = '1.0.0'
+
+
+def __getattr__(name):
+    """
+    Import the detector on first use
+
+    The API process imports lightweight submodules (sessions, batching,
+    the model server client) and must not load OpenCV, PIL or TensorFlow
+    with them; only emotion workers build an EmotionDetector.
+    """
+    if name in __all__:
+        from . import emotion_detector
+        return getattr(emotion_detector, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
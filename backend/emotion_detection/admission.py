@@ -0,0 +1,222 @@
+"""
+Emotion Admission Control
+Load shedding and stale-frame dropping for live emotion traffic, so an
+overloaded service answers late frames with a fast "skipped" instead of
+analyzing them after the candidate has moved on
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+# Reasons a frame is not analyzed
+DROP_REASONS = ('shed', 'superseded', 'stale')
+
+
+class FrameDropped(Exception):
+    """A frame was not admitted for analysis"""
+
+    def __init__(self, reason: str):
+        """
+        Args:
+            reason: One of DROP_REASONS
+        """
+        super().__init__(f"Frame skipped ({reason})")
+        self.reason = reason
+
+
+class FrameSlot:
+    """
+    Per-session admission state: at most one frame analyzing and one waiting.
+
+    A newer frame replaces the waiting one, so a session never builds up a
+    backlog - after a slow frame the newest frame is analyzed next.
+    """
+
+    def __init__(self):
+        self.busy = False
+        self.waiting: Optional[asyncio.Future] = None
+        self.latest_timestamp: Optional[float] = None
+
+
+class AdmissionController:
+    """
+    Admission control in front of the micro-batcher.
+
+    - Shedding: when `max_in_flight` frames are already being analyzed, new
+      frames are refused immediately (routes answer 429).
+    - Latest frame wins: each live session keeps only its newest waiting frame.
+    - Deadlines: a frame is dropped as stale when it waited longer than
+      `max_frame_age` seconds, or when its client timestamp is that far
+      behind the newest timestamp the session has sent.
+    """
+
+    def __init__(self, max_in_flight: int = 64, max_frame_age: float = 2.0):
+        """
+        Args:
+            max_in_flight: Frames analyzed at once before shedding (0 = unlimited)
+            max_frame_age: Deadline in seconds for a frame to start analysis (0 = none)
+        """
+        self.max_in_flight = max_in_flight
+        self.max_frame_age = max_frame_age
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.admitted = 0
+        self.dropped = {reason: 0 for reason in DROP_REASONS}
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        slot: Optional[FrameSlot] = None,
+        timestamp: Optional[float] = None
+    ) -> AsyncIterator[None]:
+        """
+        Hold an analysis slot for one frame
+
+        Usage:
+            async with admission.admit(session.frame_slot, timestamp):
+                faces = await batcher.submit(image)
+
+        Args:
+            slot: Session admission state (None for frames outside a live session)
+            timestamp: Client timestamp of the frame in seconds
+
+        Raises:
+            FrameDropped: If the frame is shed, superseded or stale
+        """
+        received_at = time.monotonic()
+
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            self._drop('shed')
+
+        if slot is not None:
+            if timestamp is not None and (slot.latest_timestamp is None or timestamp > slot.latest_timestamp):
+                slot.latest_timestamp = timestamp
+
+            # A frame already behind its session must not replace a newer waiting one
+            if self._is_stale(slot, timestamp, received_at):
+                self._drop('stale')
+
+            if slot.busy:
+                await self._wait_for_slot(slot)
+                if self._is_stale(slot, timestamp, received_at):
+                    self._release(slot)
+                    self._drop('stale')
+            slot.busy = True
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.admitted += 1
+
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if slot is not None:
+                self._release(slot)
+
+    async def _wait_for_slot(self, slot: FrameSlot) -> None:
+        """Wait as the session's newest frame until the running one finishes"""
+        if slot.waiting is not None and not slot.waiting.done():
+            slot.waiting.set_result(False)
+
+        waiting = asyncio.get_running_loop().create_future()
+        slot.waiting = waiting
+
+        try:
+            handed_over = await waiting
+        except asyncio.CancelledError:
+            # The slot may already have been handed to this (now gone) frame
+            if waiting.done() and not waiting.cancelled() and waiting.result():
+                self._release(slot)
+            raise
+
+        if not handed_over:
+            self._drop('superseded')
+
+    def _is_stale(self, slot: FrameSlot, timestamp: Optional[float], received_at: float) -> bool:
+        """Whether a frame missed its deadline while waiting or against newer frames"""
+        if not self.max_frame_age:
+            return False
+
+        age = time.monotonic() - received_at
+        if timestamp is not None and slot.latest_timestamp is not None:
+            age = max(age, slot.latest_timestamp - timestamp)
+
+        return age > self.max_frame_age
+
+    def _release(self, slot: FrameSlot) -> None:
+        """Free a session slot, handing it straight to the waiting frame if any"""
+        waiting, slot.waiting = slot.waiting, None
+
+        if waiting is not None and not waiting.done():
+            waiting.set_result(True)
+        else:
+            slot.busy = False
+
+    def _drop(self, reason: str) -> None:
+        """Count a dropped frame and refuse it"""
+        self.dropped[reason] += 1
+        raise FrameDropped(reason)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get admission statistics
+
+        Returns:
+            Dictionary with limits, current and peak load, and drop counters
+        """
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_frame_age_seconds": self.max_frame_age,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "admitted": self.admitted,
+            "dropped": dict(self.dropped),
+        }
+
+    def render_prometheus(self) -> str:
+        """
+        Render admission counters in the Prometheus text exposition format
+
+        Returns:
+            Metrics text
+        """
+        lines = [
+            '# HELP emotion_frames_in_flight Live frames currently being analyzed',
+            '# TYPE emotion_frames_in_flight gauge',
+            f'emotion_frames_in_flight {self.in_flight}',
+            '# HELP emotion_frames_admitted_total Live frames admitted for analysis',
+            '# TYPE emotion_frames_admitted_total counter',
+            f'emotion_frames_admitted_total {self.admitted}',
+            '# HELP emotion_frames_dropped_total Live frames skipped by admission control',
+            '# TYPE emotion_frames_dropped_total counter',
+        ]
+        lines += [f'emotion_frames_dropped_total{{reason="{reason}"}} {count}' for reason, count in self.dropped.items()]
+
+        return '\n'.join(lines) + '\n'
+
+
+# Singleton instance
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller(max_in_flight: int = 64, max_frame_age: float = 2.0) -> AdmissionController:
+    """
+    Get singleton instance of the admission controller
+
+    Args:
+        max_in_flight: Frames analyzed at once before shedding (only used on first call)
+        max_frame_age: Frame deadline in seconds (only used on first call)
+
+    Returns:
+        AdmissionController instance
+    """
+    global _admission_controller
+
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(max_in_flight, max_frame_age)
+
+    return _admission_controller
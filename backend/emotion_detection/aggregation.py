@@ -0,0 +1,151 @@
+"""
+Emotion Aggregation
+Incremental per-interview / per-question emotion summary, updated one frame
+at a time from any ingestion path (timeline, HTTP frames, WebSocket stream)
+"""
+
+from typing import Any, Dict, List, Optional
+
+from .labels import EMOTION_LABELS, SENTIMENT_MAPPING
+
+
+class EmotionAggregator:
+    """
+    Running emotion summary for one interview or question.
+
+    Every update is O(1): counts and dwell times live in fixed-size dicts,
+    sentiment is tracked as a running mean and an exponential moving
+    average, and the emotion track is run-length encoded so a steady
+    expression only extends its current segment. `snapshot()` never walks
+    the track, so it costs the same after 10 frames or 10 hours; the
+    segments themselves are read with `track(since)`.
+    """
+
+    def __init__(self, ema_alpha: float = 0.1):
+        """
+        Args:
+            ema_alpha: Weight of the newest frame in the sentiment EMA (0-1]
+        """
+        self.ema_alpha = ema_alpha
+
+        self.frames = 0
+        self.frames_with_faces = 0
+        self.emotion_counts = {label: 0 for label in EMOTION_LABELS}
+        self.dwell_seconds = {label: 0.0 for label in EMOTION_LABELS}
+        self.sentiment_sum = 0.0
+        self.confidence_sum = 0.0
+        self.sentiment_ema: Optional[float] = None
+
+        # Run-length encoded track: [emotion, start, end, frames] per segment
+        self.segments: List[List[Any]] = []
+        self._last_emotion: Optional[str] = None
+        self._last_timestamp: Optional[float] = None
+
+    def update(self, emotion: Optional[str], timestamp: float, confidence: float = 0.0) -> None:
+        """
+        Record the primary emotion of one frame
+
+        A frame without a face (emotion None) ends the current segment, and
+        the gap up to the next face is not counted as dwell time.
+
+        Args:
+            emotion: Primary emotion of the frame, or None if no face was found
+            timestamp: Frame timestamp in seconds
+            confidence: Model confidence of the primary emotion
+        """
+        self.frames += 1
+
+        # Time since the previous frame counts towards the emotion shown then
+        if (
+            self._last_emotion is not None
+            and emotion is not None
+            and timestamp >= self._last_timestamp
+        ):
+            self.dwell_seconds[self._last_emotion] += timestamp - self._last_timestamp
+
+        if emotion is not None:
+            sentiment = SENTIMENT_MAPPING.get(emotion, 0.0)
+
+            self.frames_with_faces += 1
+            self.emotion_counts[emotion] += 1
+            self.sentiment_sum += sentiment
+            self.confidence_sum += confidence
+            self.sentiment_ema = (
+                sentiment if self.sentiment_ema is None
+                else self.ema_alpha * sentiment + (1 - self.ema_alpha) * self.sentiment_ema
+            )
+
+            if emotion == self._last_emotion:
+                segment = self.segments[-1]
+                segment[2] = timestamp
+                segment[3] += 1
+            else:
+                self.segments.append([emotion, timestamp, timestamp, 1])
+
+        self._last_emotion = emotion
+        self._last_timestamp = timestamp
+
+    def update_faces(self, faces: List[Dict[str, Any]], timestamp: float) -> None:
+        """
+        Record one frame in EmotionDetector.analyze_frame format
+
+        Args:
+            faces: Face results for the frame (first face is the primary one)
+            timestamp: Frame timestamp in seconds
+        """
+        if faces:
+            self.update(faces[0]['emotion'], timestamp, faces[0]['confidence'])
+        else:
+            self.update(None, timestamp)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current summary in constant time
+
+        Returns:
+            Summary in the /emotion/timeline summary shape, extended with
+            sentiment EMA, dwell times and the current segment
+        """
+        dominant_emotion = max(self.emotion_counts.items(), key=lambda x: x[1])[0]
+        average_sentiment = (
+            self.sentiment_sum / self.frames_with_faces if self.frames_with_faces else 0.0
+        )
+        average_confidence = (
+            self.confidence_sum / self.frames_with_faces if self.frames_with_faces else 0.0
+        )
+        current = self.segments[-1] if self.segments else None
+
+        return {
+            'dominant_emotion': dominant_emotion,
+            'emotion_distribution': dict(self.emotion_counts),
+            'average_sentiment': average_sentiment,
+            'average_confidence': average_confidence,
+            'sentiment_ema': self.sentiment_ema if self.sentiment_ema is not None else 0.0,
+            'dwell_seconds': {label: round(seconds, 3) for label, seconds in self.dwell_seconds.items()},
+            'total_frames': self.frames,
+            'frames_with_faces': self.frames_with_faces,
+            'segments': len(self.segments),
+            'current_segment': _segment_dict(current) if current else None,
+        }
+
+    def track(self, since: int = 0) -> List[Dict[str, Any]]:
+        """
+        Get the run-length encoded emotion track
+
+        Clients polling a long session pass the segment count they already
+        have; the last segment they saw may have been extended since, so it
+        is worth re-reading from `since - 1`.
+
+        Args:
+            since: Index of the first segment to return
+
+        Returns:
+            List of {emotion, start, end, frames} segments
+        """
+        return [_segment_dict(segment) for segment in self.segments[max(0, since):]]
+
+
+def _segment_dict(segment: List[Any]) -> Dict[str, Any]:
+    """Convert an internal track segment to its JSON form"""
+    emotion, start, end, frames = segment
+    return {'emotion': emotion, 'start': start, 'end': end, 'frames': frames}
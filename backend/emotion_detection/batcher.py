@@ -0,0 +1,179 @@
+"""
+Emotion Micro-Batching Scheduler
+Collects frames from concurrent requests and analyzes them together,
+so many live interviews share one model call instead of one call each
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from .executor import EmotionExecutor
+from .metrics import BATCH_SIZE_BUCKETS, QUEUE_WAIT_BUCKETS, Histogram
+from .tracking import FaceTrack
+
+# Queued frame: (image, face track, face detector, queued_at, future)
+_QueuedFrame = Tuple[Union[str, bytes], Optional[FaceTrack], Optional[str], float, asyncio.Future]
+
+
+class MicroBatcher:
+    """
+    Dynamic batcher in front of the emotion executor.
+
+    A batch is flushed when it reaches `max_batch_size` frames or when
+    its oldest frame has waited `max_wait_ms`, whichever comes first.
+    The whole batch is analyzed with `EmotionDetector.analyze_images_tracked`
+    (one batched forward pass for all faces) and each result is handed
+    back to the request that submitted the frame.
+    """
+
+    def __init__(self, executor: EmotionExecutor, max_batch_size: int = 16, max_wait_ms: float = 10.0):
+        """
+        Args:
+            executor: Emotion executor that runs the batches
+            max_batch_size: Maximum frames per model call
+            max_wait_ms: Maximum time a frame waits for its batch to fill
+        """
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._pending: List[_QueuedFrame] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._running_batches: Set[asyncio.Task] = set()
+
+        self.batch_size_histogram = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_histogram = Histogram(QUEUE_WAIT_BUCKETS)
+
+    async def submit(self, image: Union[str, bytes], detector: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Queue a frame for batched analysis
+
+        Args:
+            image: Base64 encoded image string or raw encoded image bytes
+            detector: Face detector backend name (None for the worker default)
+
+        Returns:
+            List of emotion analysis results for the frame
+        """
+        faces, _ = await self.submit_tracked(image, None, detector)
+        return faces
+
+    async def submit_tracked(
+        self,
+        image: Union[str, bytes],
+        track: Optional[FaceTrack],
+        detector: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[FaceTrack]]:
+        """
+        Queue a frame of a live session for batched analysis with face tracking
+
+        Args:
+            image: Base64 encoded image string or raw encoded image bytes
+            track: Session face tracking state (None for full detection)
+            detector: Face detector backend name (None for the worker default)
+
+        Returns:
+            Tuple of (emotion analysis results, updated tracking state)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((image, track, detector, time.perf_counter(), future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """Send all pending frames to the executor as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        flushed_at = time.perf_counter()
+        self.batch_size_histogram.observe(len(batch))
+        for _, _, _, queued_at, _ in batch:
+            self.queue_wait_histogram.observe(flushed_at - queued_at)
+
+        # Keep a reference so the task is not garbage collected mid-flight
+        task = asyncio.ensure_future(self._run_batch(batch))
+        self._running_batches.add(task)
+        task.add_done_callback(self._running_batches.discard)
+
+    async def _run_batch(self, batch: List[_QueuedFrame]) -> None:
+        """
+        Analyze a batch and fan results back out to waiting requests
+
+        Args:
+            batch: List of (image, track, detector, queued_at, future) tuples
+        """
+        images = [image for image, _, _, _, _ in batch]
+        tracks = [track for _, track, _, _, _ in batch]
+        detectors = [detector for _, _, detector, _, _ in batch]
+
+        try:
+            results = await self.executor.run('analyze_images_tracked', images, tracks, detectors)
+        except Exception as e:
+            if len(batch) == 1:
+                _set_exception(batch[0][4], e)
+                return
+
+            # One bad frame must not fail its neighbours - retry individually
+            await asyncio.gather(*(self._run_batch([item]) for item in batch))
+            return
+
+        for (_, _, _, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        """
+        Get batching statistics
+
+        Returns:
+            Dictionary with settings, pending frames and histograms
+        """
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "pending": len(self._pending),
+            "batch_size": self.batch_size_histogram.snapshot(),
+            "queue_wait_seconds": self.queue_wait_histogram.snapshot(),
+        }
+
+
+def _set_exception(future: asyncio.Future, error: Exception) -> None:
+    """Fail a waiting request unless it was already cancelled"""
+    if not future.done():
+        future.set_exception(error)
+
+
+# Singleton instance
+_micro_batcher: Optional[MicroBatcher] = None
+
+
+def get_micro_batcher(executor: EmotionExecutor, max_batch_size: int = 16, max_wait_ms: float = 10.0) -> MicroBatcher:
+    """
+    Get singleton instance of the micro-batcher
+
+    Args:
+        executor: Emotion executor (only used on first call)
+        max_batch_size: Maximum frames per batch (only used on first call)
+        max_wait_ms: Maximum batching delay (only used on first call)
+
+    Returns:
+        MicroBatcher instance
+    """
+    global _micro_batcher
+
+    if _micro_batcher is None:
+        _micro_batcher = MicroBatcher(executor, max_batch_size, max_wait_ms)
+
+    return _micro_batcher
@@ -0,0 +1,294 @@
+"""
+Emotion Detection Benchmarks
+Measures the speed of pipeline stages on a set of images
+
+Usage:
+    python -m emotion_detection.benchmark detection --images photos/*.jpg
+    python -m emotion_detection.benchmark detection --widths 0 640 320 240
+    python -m emotion_detection.benchmark detectors --images photos/*.jpg --backends dlib haar dnn
+    python -m emotion_detection.benchmark threads --images photos/*.jpg --workers 1 2 4 --intra-op 1 2 4
+"""
+
+import argparse
+import asyncio
+import itertools
+import sys
+import time
+from typing import Callable, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from emotion_detection.face_detectors import FACE_DETECTORS
+
+
+def load_images(paths: Sequence[str]) -> List[np.ndarray]:
+    """
+    Load benchmark images (BGR), or synthesize webcam-sized frames if none are given
+
+    Args:
+        paths: Image file paths
+
+    Returns:
+        List of frames
+    """
+    if not paths:
+        print("No images given - using synthetic 1280x720 frames (speed only, no faces)")
+        return [np.random.randint(0, 255, (720, 1280, 3), dtype=np.uint8) for _ in range(5)]
+
+    images = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is None:
+            print(f"Warning: could not read {path}")
+            continue
+        images.append(image)
+
+    return images
+
+
+def time_call(func: Callable, repeat: int) -> float:
+    """
+    Time a function call
+
+    Args:
+        func: Function to call
+        repeat: Number of timed calls (after one warm-up call)
+
+    Returns:
+        Mean duration in milliseconds
+    """
+    func()
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+
+    return (time.perf_counter() - started) / repeat * 1000.0
+
+
+def box_iou(a: tuple, b: tuple) -> float:
+    """Intersection over union of two (top, right, bottom, left) boxes"""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    intersection = max(0, bottom - top) * max(0, right - left)
+
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    union = area_a + area_b - intersection
+
+    return intersection / union if union else 0.0
+
+
+def matched_faces(reference: List[tuple], found: List[tuple], min_iou: float = 0.5) -> int:
+    """Count reference boxes that have an overlapping box in `found`"""
+    return sum(1 for ref in reference if any(box_iou(ref, box) >= min_iou for box in found))
+
+
+def benchmark_detection(images: List[np.ndarray], widths: Sequence[int], repeat: int) -> None:
+    """
+    Compare face detection speed and recall across detection widths
+
+    Recall is measured against full-resolution detection.
+
+    Args:
+        images: Benchmark frames
+        widths: Detection widths to compare (0 = full resolution)
+        repeat: Timed calls per image
+    """
+    from emotion_detection.emotion_detector import EmotionDetector
+
+    reference_detector = EmotionDetector(detection_width=None)
+    reference = [reference_detector.detect_faces(image) for image in images]
+    reference_faces = sum(len(faces) for faces in reference)
+
+    print(f"\n{len(images)} images, {reference_faces} faces at full resolution\n")
+    print(f"{'width':>8} {'ms/frame':>10} {'speedup':>8} {'recall':>8}")
+
+    baseline_ms = None
+    for width in widths:
+        detector = EmotionDetector(detection_width=width)
+
+        mean_ms = float(np.mean([
+            time_call(lambda image=image: detector.detect_faces(image), repeat)
+            for image in images
+        ]))
+        baseline_ms = baseline_ms or mean_ms
+
+        found = [detector.detect_faces(image) for image in images]
+        matched = sum(matched_faces(ref, faces) for ref, faces in zip(reference, found))
+        recall = f"{matched / reference_faces:.1%}" if reference_faces else "n/a"
+
+        label = str(width) if width else "full"
+        print(f"{label:>8} {mean_ms:>10.1f} {baseline_ms / mean_ms:>7.1f}x {recall:>8}")
+
+
+def benchmark_detectors(
+    images: List[np.ndarray],
+    backends: Sequence[str],
+    width: int,
+    repeat: int,
+    reference_backend: str = 'dlib'
+) -> None:
+    """
+    Compare face detector backends on speed and recall
+
+    Recall is measured against the reference backend at full resolution.
+    Backends whose model files are missing are reported and skipped.
+
+    Args:
+        images: Benchmark frames
+        backends: Face detector backend names to compare
+        width: Detection width for all backends (0 = full resolution)
+        repeat: Timed calls per image
+        reference_backend: Backend whose detections count as ground truth
+    """
+    from emotion_detection.emotion_detector import EmotionDetector
+
+    reference_detector = EmotionDetector(detection_width=None, face_detector=reference_backend)
+    reference = [reference_detector.detect_faces(image) for image in images]
+    reference_faces = sum(len(faces) for faces in reference)
+
+    print(f"\n{len(images)} images, {reference_faces} faces found by {reference_backend} at full resolution\n")
+    print(f"{'backend':>8} {'ms/frame':>10} {'speedup':>8} {'recall':>8} {'faces':>6}")
+
+    baseline_ms = None
+    for backend in backends:
+        try:
+            detector = EmotionDetector(detection_width=width, face_detector=backend)
+        except (ImportError, ValueError) as e:
+            print(f"{backend:>8} skipped: {e}")
+            continue
+
+        mean_ms = float(np.mean([
+            time_call(lambda image=image: detector.detect_faces(image), repeat)
+            for image in images
+        ]))
+        baseline_ms = baseline_ms or mean_ms
+
+        found = [detector.detect_faces(image) for image in images]
+        matched = sum(matched_faces(ref, faces) for ref, faces in zip(reference, found))
+        recall = f"{matched / reference_faces:.1%}" if reference_faces else "n/a"
+        found_faces = sum(len(faces) for faces in found)
+
+        print(f"{backend:>8} {mean_ms:>10.1f} {baseline_ms / mean_ms:>7.1f}x {recall:>8} {found_faces:>6}")
+
+
+def benchmark_threads(
+    images: List[np.ndarray],
+    workers: Sequence[int],
+    intra_op: Sequence[int],
+    inter_op: Sequence[int],
+    pin: bool,
+    seconds: float,
+    model_path: Optional[str] = None
+) -> None:
+    """
+    Sweep worker counts and thread pool sizes and compare throughput per core
+
+    Every combination starts a fresh worker pool (thread pools can only be
+    sized before a process first runs the model), keeps each worker busy
+    with full batches for `seconds`, and reports end-to-end frames/sec and
+    frames/sec per core used. The cores used are the CPUs the workers were
+    pinned to, or otherwise workers x intra-op threads capped at the
+    usable CPUs.
+
+    Args:
+        images: Benchmark frames (encoded as JPEG for the workers)
+        workers: Worker process counts to try
+        intra_op: Intra-op thread counts to try (0 = library default)
+        inter_op: Inter-op thread counts to try (0 = library default)
+        pin: Pin each worker to its own CPUs
+        seconds: Measured time per combination
+        model_path: Model to load (empty for the bundled default)
+    """
+    from emotion_detection.executor import EmotionExecutor
+    from emotion_detection.runtime import usable_cpus
+
+    frames = [cv2.imencode('.jpg', image)[1].tobytes() for image in images]
+    cpus = usable_cpus()
+
+    async def measure(executor: EmotionExecutor) -> float:
+        await executor.warm_up()
+        deadline = time.perf_counter() + seconds
+        analyzed = 0
+
+        async def feed():
+            nonlocal analyzed
+            while time.perf_counter() < deadline:
+                await executor.run('analyze_images', frames)
+                analyzed += len(frames)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(feed() for _ in range(executor.max_workers * 2)))
+        return analyzed / (time.perf_counter() - started)
+
+    print(f"\n{len(frames)} frames per batch, {len(cpus)} usable CPUs, {seconds:.0f}s per setting\n")
+    print(f"{'workers':>8} {'intra':>6} {'inter':>6} {'cores':>6} {'frames/s':>10} {'per core':>9}")
+
+    for worker_count, intra, inter in itertools.product(workers, intra_op, inter_op):
+        executor = EmotionExecutor(
+            max_workers=worker_count,
+            model_path=model_path,
+            detector_options={'intra_op_threads': intra, 'inter_op_threads': inter},
+            stage_timing=False,
+            pin_workers=pin
+        )
+        try:
+            fps = asyncio.run(measure(executor))
+        finally:
+            executor.shutdown()
+
+        if pin:
+            cores = len({cpu for cpu_set in executor.cpu_sets() for cpu in cpu_set})
+        else:
+            cores = min(len(cpus), worker_count * (intra or len(cpus)))
+
+        print(
+            f"{worker_count:>8} {intra or 'def':>6} {inter or 'def':>6} {cores:>6} "
+            f"{fps:>10.1f} {fps / cores:>9.1f}"
+        )
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Emotion detection benchmarks")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    detection = subparsers.add_parser("detection", help="Face detection speed vs. detection width")
+    detection.add_argument("--images", nargs="*", default=[], help="Image files (faces recommended)")
+    detection.add_argument("--widths", nargs="+", type=int, default=[0, 640, 480, 320])
+    detection.add_argument("--repeat", type=int, default=3)
+
+    detectors = subparsers.add_parser("detectors", help="Face detector backends: speed vs. recall")
+    detectors.add_argument("--images", nargs="*", default=[], help="Image files (faces recommended)")
+    detectors.add_argument("--backends", nargs="+", default=list(FACE_DETECTORS), choices=FACE_DETECTORS)
+    detectors.add_argument("--width", type=int, default=320, help="Detection width (0 = full resolution)")
+    detectors.add_argument("--reference", default="dlib", choices=FACE_DETECTORS)
+    detectors.add_argument("--repeat", type=int, default=3)
+
+    threads = subparsers.add_parser("threads", help="Worker and thread pool sizes: frames/sec per core")
+    threads.add_argument("--images", nargs="*", default=[], help="Image files (faces recommended)")
+    threads.add_argument("--workers", nargs="+", type=int, default=[1, 2])
+    threads.add_argument("--intra-op", nargs="+", type=int, default=[0, 1, 2, 4], help="0 = library default")
+    threads.add_argument("--inter-op", nargs="+", type=int, default=[1], help="0 = library default")
+    threads.add_argument("--pin", action="store_true", help="Pin each worker to its own CPUs")
+    threads.add_argument("--seconds", type=float, default=10.0, help="Measured time per setting")
+    threads.add_argument("--model", default="", help="Model path (default: bundled model)")
+
+    args = parser.parse_args(argv)
+
+    if args.benchmark == "detection":
+        benchmark_detection(load_images(args.images), args.widths, args.repeat)
+    elif args.benchmark == "detectors":
+        benchmark_detectors(load_images(args.images), args.backends, args.width, args.repeat, args.reference)
+    elif args.benchmark == "threads":
+        benchmark_threads(
+            load_images(args.images), args.workers, args.intra_op, args.inter_op,
+            args.pin, args.seconds, args.model
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Frame Deduplication
+Perceptual-hash cache that lets a live session reuse the analysis of a
+near-identical recent frame instead of running detection and inference again
+"""
+
+import base64
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+
+# Difference hash grid: (HASH_SIZE + 1) x HASH_SIZE pixels -> HASH_SIZE^2 bits
+HASH_SIZE = 8
+
+
+# Linear reduction of decode_reduced_gray
+REDUCED_DECODE_FACTOR = 8
+
+
+def decode_reduced_gray(image: Union[str, bytes]) -> Optional[np.ndarray]:
+    """
+    Decode an encoded frame at 1/8 scale in grayscale
+
+    JPEG frames use DCT scaling, so this costs a fraction of a full decode.
+    The result is shared by hashing and adaptive sampling.
+
+    Args:
+        image: Base64 encoded image string (data URL prefix allowed) or raw image bytes
+
+    Returns:
+        Grayscale image, or None if the image cannot be decoded
+    """
+    try:
+        if isinstance(image, str):
+            if ',' in image:
+                image = image.split(',')[1]
+            image = base64.b64decode(image)
+
+        # Imported on first use so the API process starts without OpenCV
+        import cv2
+
+        return cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    except Exception:
+        return None
+
+
+def difference_hash(gray: np.ndarray) -> int:
+    """
+    Compute a 64-bit difference hash (dHash) of a grayscale image
+
+    Args:
+        gray: Grayscale image of any size
+
+    Returns:
+        Hash as an int
+    """
+    import cv2
+
+    small = cv2.resize(gray, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def perceptual_hash(image: Union[str, bytes]) -> Optional[int]:
+    """
+    Compute a 64-bit difference hash (dHash) of an encoded frame
+
+    Args:
+        image: Base64 encoded image string (data URL prefix allowed) or raw image bytes
+
+    Returns:
+        Hash as an int, or None if the image cannot be decoded
+    """
+    gray = decode_reduced_gray(image)
+
+    return difference_hash(gray) if gray is not None else None
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return (a ^ b).bit_count()
+
+
+class FrameCache:
+    """
+    Near-duplicate frame cache for one live session.
+
+    A frame whose hash is within `max_distance` bits of a cached frame
+    analyzed less than `window_seconds` ago reuses that frame's faces.
+    Entries are not refreshed on a hit, so a static scene is still
+    re-analyzed at least once per window. The cache holds at most
+    `max_size` entries, evicting the least recently used.
+    """
+
+    def __init__(self, max_distance: int = 4, window_seconds: float = 2.0, max_size: int = 8):
+        """
+        Args:
+            max_distance: Maximum Hamming distance (of 64 bits) for a hit
+            window_seconds: Maximum age of a reusable result
+            max_size: Maximum number of cached frames
+        """
+        self.max_distance = max_distance
+        self.window_seconds = window_seconds
+        self.max_size = max(1, max_size)
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, frame_hash: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Find the result of a recent near-identical frame
+
+        Args:
+            frame_hash: Perceptual hash of the new frame
+
+        Returns:
+            Cached face results, or None on a miss
+        """
+        self._expire()
+
+        best_key, best_distance = None, self.max_distance + 1
+        for key in self._entries:
+            distance = hamming_distance(key, frame_hash)
+            if distance < best_distance:
+                best_key, best_distance = key, distance
+
+        if best_key is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][1]
+
+    def store(self, frame_hash: int, faces: List[Dict[str, Any]]) -> None:
+        """
+        Cache the analysis result of a frame
+
+        Args:
+            frame_hash: Perceptual hash of the frame
+            faces: Face results for the frame
+        """
+        self._entries[frame_hash] = (time.monotonic(), faces)
+        self._entries.move_to_end(frame_hash)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def _expire(self) -> None:
+        """Drop entries older than the reuse window"""
+        cutoff = time.monotonic() - self.window_seconds
+        expired = [key for key, (stored_at, _) in self._entries.items() if stored_at < cutoff]
+
+        for key in expired:
+            del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit rate and current size
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+        }
@@ -5,42 +5,373 @@ Detects 7 emotions: angry, disgust, fear, happy, sad, surprise, neutral
 
 import cv2
 import numpy as np
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, Dropout, Flatten, Conv2D, MaxPooling2D
-from tensorflow.keras.preprocessing.image import img_to_array
-import face_recognition
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 import base64
+import hashlib
+import os
+import time
 from io import BytesIO
 from PIL import Image
 
-class EmotionDetector:
-    def __init__(self, model_path: Optional[str] = None):
+from .face_detectors import create_face_detector
+from .labels import EMOTION_LABELS, SENTIMENT_MAPPING
+from .metrics import StageTimer
+from .runtime import TFLiteModel, configure_tensorflow_threads, resolve_inference_backend, usable_cpus
+from .tracking import FaceTrack
+
+# cv2.imdecode flags for libjpeg DCT-scaled decoding, by reduction factor
+JPEG_REDUCED_DECODE_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+
+class FaceExtractor:
+    """
+    Face detection and preprocessing half of the emotion pipeline.
+    
+    Finds faces (with tracking between detections) and turns them into
+    48x48 model input, without loading the emotion model. Used on its own
+    where only face crops are needed, e.g. export calibration.
+    """
+    
+    def __init__(
+        self,
+        detection_width: Optional[int] = None,
+        detection_upsample: int = 1,
+        detection_model: str = 'hog',
+        stage_timing: bool = True,
+        face_detector: str = 'dlib',
+        face_detector_options: Optional[Dict[str, Any]] = None
+    ):
         """
-        Initialize emotion detector with CNN model
+        Args:
+            detection_width: Downscale frames wider than this before face
+                detection (None or 0 to detect at full resolution)
+            detection_upsample: face_recognition number_of_times_to_upsample (dlib)
+            detection_model: face_recognition detection model ('hog' or 'cnn', dlib)
+            stage_timing: Time pipeline stages (toggle later via self.timer.enabled)
+            face_detector: Default face detector backend (see face_detectors module)
+            face_detector_options: Extra create_face_detector keyword arguments
+                (lbp_cascade, dnn_prototxt, dnn_weights, dnn_confidence)
+        """
+        self.detection_width = detection_width or None
+        self.detection_upsample = detection_upsample
+        self.detection_model = detection_model
+        self.timer = StageTimer(stage_timing)
+        
+        # Reused (N, 48, 48) resize and (N, 48, 48, 1) model input buffers,
+        # grown to the next power of two when a batch does not fit
+        self._resized_faces = np.empty((0, 48, 48), dtype=np.uint8)
+        self._face_batch = np.empty((0, 48, 48, 1), dtype=np.float32)
+        
+        # Face detector backends by name, created on first use; the default
+        # one is created now so a misconfigured deployment fails at startup
+        self.face_detector = face_detector
+        self.face_detector_options = face_detector_options or {}
+        self._face_detectors: Dict[str, Any] = {}
+        self.get_face_detector()
+    
+    def get_face_detector(self, name: Optional[str] = None):
+        """
+        Get a face detector backend, creating it on first use
         
         Args:
-            model_path: Path to pre-trained model weights (optional)
+            name: Backend name (None for the default backend)
+            
+        Returns:
+            Face detector backend (see face_detectors module)
+        """
+        name = name or self.face_detector
+        backend = self._face_detectors.get(name)
+        
+        if backend is None:
+            backend = create_face_detector(
+                name,
+                upsample=self.detection_upsample,
+                model=self.detection_model,
+                **self.face_detector_options
+            )
+            self._face_detectors[name] = backend
+        
+        return backend
+    
+    def detect_faces(self, frame: np.ndarray, detector: Optional[str] = None) -> List[tuple]:
         """
-        self.emotion_labels = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
-        self.model = self._build_model()
+        Detect faces in frame
         
-        if model_path:
-            try:
-                self.model.load_weights(model_path)
-                print(f"Loaded model weights from {model_path}")
-            except Exception as e:
-                print(f"Warning: Could not load model weights: {e}")
-                print("Using randomly initialized model. Train the model for better results.")
+        Args:
+            frame: Input image as numpy array (BGR format from OpenCV)
+            detector: Face detector backend name (None for the default backend)
+            
+        Returns:
+            List of face locations as (top, right, bottom, left) tuples
+            in full-resolution frame coordinates
+        """
+        with self.timer.stage('detect'):
+            return self._detect_faces(frame, self.get_face_detector(detector))
+    
+    def _detect_faces(self, frame: np.ndarray, backend) -> List[tuple]:
+        """Run face detection on a reduced frame and map boxes back (see detect_faces)"""
+        height, width = frame.shape[:2]
+        
+        # Detect on a reduced frame - cost scales with pixel count
+        scale = 1.0
+        if self.detection_width and width > self.detection_width:
+            scale = self.detection_width / width
+            frame = cv2.resize(
+                frame,
+                (self.detection_width, max(1, round(height * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+        
+        # Convert only if the backend cannot use the BGR buffer as is
+        if backend.color_mode == 'rgb':
+            with self.timer.stage('color'):
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        elif backend.color_mode == 'gray' and frame.ndim == 3:
+            with self.timer.stage('color'):
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        # Detect faces
+        face_locations = backend.detect(frame)
+        
+        if scale == 1.0:
+            return face_locations
+        
+        # Map boxes back to full resolution
+        return [
+            (
+                max(0, int(round(top / scale))),
+                min(width, int(round(right / scale))),
+                min(height, int(round(bottom / scale))),
+                max(0, int(round(left / scale)))
+            )
+            for top, right, bottom, left in face_locations
+        ]
     
-    def _build_model(self) -> Sequential:
+    def preprocess_face(self, face_roi: np.ndarray) -> np.ndarray:
+        """
+        Preprocess face ROI for emotion detection
+        
+        Args:
+            face_roi: Face region of interest as numpy array (BGR or grayscale)
+            
+        Returns:
+            Preprocessed face ready for model input, shape (1, 48, 48, 1) float32
+        """
+        return self.preprocess_faces([face_roi]).copy()
+    
+    def preprocess_faces(self, face_rois: List[np.ndarray]) -> np.ndarray:
+        """
+        Preprocess several face ROIs into one model input batch
+        
+        Each ROI is resized straight into a reused uint8 buffer and the
+        whole batch is scaled to [0, 1] in one pass into a reused float32
+        buffer, so no per-face arrays are allocated. The returned array is a
+        view of that buffer and is overwritten by the next call.
+        
+        Args:
+            face_rois: Face regions of interest; grayscale crops (as produced
+                by analyze_frames) skip the per-face color conversion
+            
+        Returns:
+            Model input batch, shape (N, 48, 48, 1) float32
+        """
+        count = len(face_rois)
+        if count > len(self._face_batch):
+            capacity = 1 << (count - 1).bit_length()
+            self._resized_faces = np.empty((capacity, 48, 48), dtype=np.uint8)
+            self._face_batch = np.empty((capacity, 48, 48, 1), dtype=np.float32)
+        
+        resized = self._resized_faces[:count]
+        for face_roi, resized_face in zip(face_rois, resized):
+            if face_roi.ndim == 3:
+                with self.timer.stage('color'):
+                    face_roi = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
+            cv2.resize(face_roi, (48, 48), dst=resized_face)
+        
+        batch = self._face_batch[:count]
+        np.multiply(resized, np.float32(1.0 / 255.0), out=batch[..., 0], casting='unsafe')
+        
+        return batch
+    
+    def locate_faces(
+        self,
+        frame: np.ndarray,
+        track: Optional[FaceTrack] = None,
+        detector: Optional[str] = None,
+        gray_frame: Optional[np.ndarray] = None
+    ) -> List[tuple]:
+        """
+        Locate faces, reusing tracked boxes between full detections
+        
+        Args:
+            frame: Input image as numpy array (BGR format)
+            track: Tracking state of the session (None to always run full detection)
+            detector: Face detector backend name (None for the default backend)
+            gray_frame: Grayscale version of the frame, if already converted
+            
+        Returns:
+            List of face locations as (top, right, bottom, left) tuples
+        """
+        if track is None:
+            return self.detect_faces(frame, detector)
+        
+        if gray_frame is None:
+            with self.timer.stage('color'):
+                gray_frame = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        # Cheap tracker between detections
+        if not track.needs_detection:
+            with self.timer.stage('detect'):
+                face_locations = track.update(gray_frame)
+            if face_locations is not None:
+                return face_locations
+        
+        # Periodic re-detection, or the tracker lost a face
+        face_locations = self.detect_faces(frame, detector)
+        track.reset(gray_frame, face_locations)
+        
+        return face_locations
+    
+    def extract_faces(
+        self,
+        frame: np.ndarray,
+        track: Optional[FaceTrack] = None,
+        detector: Optional[str] = None
+    ) -> List[tuple]:
+        """
+        Detect faces in a frame and extract their regions of interest
+        
+        The frame is converted to grayscale once; ROIs are views into the
+        grayscale frame, which also feeds the face tracker.
+        
+        Args:
+            frame: Input image as numpy array
+            track: Tracking state of the session (None to always run full detection)
+            detector: Face detector backend name (None for the default backend)
+            
+        Returns:
+            List of (face_location, grayscale face_roi) tuples for faces large enough to analyze
+        """
+        faces = []
+        
+        with self.timer.stage('color'):
+            gray_frame = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        
+        for face_location in self.locate_faces(frame, track, detector, gray_frame):
+            top, right, bottom, left = face_location
+            
+            # Extract face ROI
+            face_roi = gray_frame[top:bottom, left:right]
+            
+            # Skip if face is too small
+            if face_roi.shape[0] < 20 or face_roi.shape[1] < 20:
+                continue
+            
+            faces.append((face_location, face_roi))
+        
+        return faces
+
+
+class EmotionDetector(FaceExtractor):
+    """
+    Full emotion pipeline: face extraction (see FaceExtractor) plus the
+    emotion CNN, batched inference and frame/video analysis.
+    """
+    
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        detection_width: Optional[int] = None,
+        detection_upsample: int = 1,
+        detection_model: str = 'hog',
+        max_frame_width: Optional[int] = None,
+        inference_backend: str = 'auto',
+        stage_timing: bool = True,
+        face_detector: str = 'dlib',
+        face_detector_options: Optional[Dict[str, Any]] = None,
+        intra_op_threads: int = 0,
+        inter_op_threads: int = 0
+    ):
+        """
+        Initialize emotion detector with CNN model
+        
+        Args:
+            model_path: Path to an exported .tflite inference model or to
+                pre-trained Keras weights (optional)
+            detection_width: Downscale frames wider than this before face
+                detection (None or 0 to detect at full resolution)
+            detection_upsample: face_recognition number_of_times_to_upsample (dlib)
+            detection_model: face_recognition detection model ('hog' or 'cnn', dlib)
+            max_frame_width: Working resolution - JPEG frames at least twice
+                as wide are decoded at reduced size (None or 0 to disable)
+            inference_backend: 'auto', 'keras' or 'tflite' (see runtime module)
+            stage_timing: Time pipeline stages (toggle later via self.timer.enabled)
+            face_detector: Default face detector backend (see face_detectors module)
+            face_detector_options: Extra create_face_detector keyword arguments
+                (lbp_cascade, dnn_prototxt, dnn_weights, dnn_confidence)
+            intra_op_threads: Threads per model op, also OpenCV's thread
+                count (0 = library defaults)
+            inter_op_threads: TensorFlow ops run in parallel (0 = default; keras only)
+        """
+        super().__init__(
+            detection_width=detection_width,
+            detection_upsample=detection_upsample,
+            detection_model=detection_model,
+            stage_timing=stage_timing,
+            face_detector=face_detector,
+            face_detector_options=face_detector_options
+        )
+        self.emotion_labels = list(EMOTION_LABELS)
+        self.max_frame_width = max_frame_width or None
+        
+        load_started = time.perf_counter()
+        self.model_version = 'untrained'
+        self.inference_backend = resolve_inference_backend(model_path, inference_backend)
+        
+        # Thread pools are sized before the model creates them
+        if intra_op_threads:
+            cv2.setNumThreads(intra_op_threads)
+        self.threads = {'intra_op': intra_op_threads, 'inter_op': 0}
+        
+        if self.inference_backend == 'tflite':
+            # Frozen inference-only artifact, memory-mapped (see export_model)
+            self.model = TFLiteModel(model_path, intra_op_threads)
+            self.model_version = _weights_version(model_path)
+            print(f"Loaded inference model from {model_path}")
+        else:
+            # Training fallback: build and compile the graph, then load weights
+            self.threads = configure_tensorflow_threads(intra_op_threads, inter_op_threads)
+            self.model = self._build_model()
+            
+            if model_path:
+                try:
+                    self.model.load_weights(model_path)
+                    self.model_version = _weights_version(model_path)
+                    print(f"Loaded model weights from {model_path}")
+                except Exception as e:
+                    print(f"Warning: Could not load model weights: {e}")
+                    print("Using randomly initialized model. Train the model for better results.")
+        
+        self.load_seconds = time.perf_counter() - load_started
+        self.warmup_seconds = 0.0
+    
+    def _build_model(self):
         """
         Build CNN architecture for emotion detection
         Architecture based on the face_and_emotion_detection repository
         
+        TensorFlow is imported here rather than at module load so that
+        workers serving an exported model with tflite-runtime never load it.
+        
         Returns:
             Compiled Keras Sequential model
         """
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Dense, Dropout, Flatten, Conv2D, MaxPooling2D
+        
         model = Sequential()
         
         # First convolutional layer
@@ -70,64 +401,52 @@ class EmotionDetector:
         
         return model
     
-    def detect_faces(self, frame: np.ndarray) -> List[tuple]:
+    def predict_emotion(self, face_roi: np.ndarray) -> Dict[str, any]:
         """
-        Detect faces in frame using face_recognition library
+        Predict emotion from face region
         
         Args:
-            frame: Input image as numpy array (BGR format from OpenCV)
+            face_roi: Face region of interest as numpy array
             
         Returns:
-            List of face locations as (top, right, bottom, left) tuples
+            Dictionary containing emotion label, confidence, and all probabilities
         """
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # Detect faces
-        face_locations = face_recognition.face_locations(rgb_frame)
-        
-        return face_locations
+        return self.predict_emotions([face_roi])[0]
     
-    def preprocess_face(self, face_roi: np.ndarray) -> np.ndarray:
+    def predict_emotions(self, face_rois: List[np.ndarray]) -> List[Dict[str, any]]:
         """
-        Preprocess face ROI for emotion detection
+        Predict emotions for several face regions with a single forward pass
         
         Args:
-            face_roi: Face region of interest as numpy array
+            face_rois: List of face regions of interest as numpy arrays
             
         Returns:
-            Preprocessed face ready for model input
+            List of emotion dictionaries, one per face ROI (same order)
         """
-        # Convert to grayscale
-        gray_face = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
+        if not face_rois:
+            return []
         
-        # Resize to 48x48 (model input size)
-        resized_face = cv2.resize(gray_face, (48, 48))
+        # Preprocess all faces into one (N, 48, 48, 1) batch
+        with self.timer.stage('preprocess'):
+            batch = self.preprocess_faces(face_rois)
         
-        # Normalize pixel values
-        normalized_face = resized_face / 255.0
+        # One model dispatch for the whole batch
+        with self.timer.stage('infer'):
+            batch_probabilities = self.model.predict(batch, verbose=0)
         
-        # Reshape for model input (1, 48, 48, 1)
-        preprocessed = normalized_face.reshape(1, 48, 48, 1)
-        
-        return preprocessed
+        with self.timer.stage('postprocess'):
+            return [self._build_emotion_result(probabilities) for probabilities in batch_probabilities]
     
-    def predict_emotion(self, face_roi: np.ndarray) -> Dict[str, any]:
+    def _build_emotion_result(self, emotion_probabilities: np.ndarray) -> Dict[str, any]:
         """
-        Predict emotion from face region
+        Convert a row of model output into an emotion result dictionary
         
         Args:
-            face_roi: Face region of interest as numpy array
+            emotion_probabilities: Softmax output for a single face
             
         Returns:
             Dictionary containing emotion label, confidence, and all probabilities
         """
-        # Preprocess face
-        preprocessed_face = self.preprocess_face(face_roi)
-        
-        # Predict emotion probabilities
-        emotion_probabilities = self.model.predict(preprocessed_face, verbose=0)[0]
-        
         # Get dominant emotion
         max_index = np.argmax(emotion_probabilities)
         emotion_label = self.emotion_labels[max_index]
@@ -155,34 +474,195 @@ class EmotionDetector:
         Returns:
             List of dictionaries containing face location and emotion data
         """
+        return self.analyze_frames([frame])[0]
+    
+    def analyze_frames(
+        self,
+        frames: List[np.ndarray],
+        tracks: Optional[List[Optional[FaceTrack]]] = None,
+        detectors: Optional[List[Optional[str]]] = None
+    ) -> List[List[Dict[str, any]]]:
+        """
+        Analyze all faces in several frames with one batched model call
+        
+        Faces are detected frame by frame, then every face ROI from every
+        frame is preprocessed into a single (N, 48, 48, 1) float32 tensor so
+        the CNN is dispatched once instead of once per face.
+        
+        Args:
+            frames: List of input images as numpy arrays
+            tracks: Optional tracking state per frame (updated in place)
+            detectors: Optional face detector backend name per frame
+            
+        Returns:
+            List with one entry per frame, each a list of face results
+            (same format as analyze_frame)
+        """
+        if tracks is None:
+            tracks = [None] * len(frames)
+        if detectors is None:
+            detectors = [None] * len(frames)
+        
+        # Detect faces in every frame, remembering which frame each ROI came from
+        frame_faces = [
+            self.extract_faces(frame, track, detector)
+            for frame, track, detector in zip(frames, tracks, detectors)
+        ]
+        face_rois = [face_roi for faces in frame_faces for _, face_roi in faces]
+        
+        # Single forward pass for all faces
+        emotions = iter(self.predict_emotions(face_rois))
+        
         results = []
+        with self.timer.stage('postprocess'):
+            for faces in frame_faces:
+                frame_results = []
+                
+                for (top, right, bottom, left), _ in faces:
+                    frame_results.append({
+                        'location': {
+                            'top': top,
+                            'right': right,
+                            'bottom': bottom,
+                            'left': left
+                        },
+                        **next(emotions)
+                    })
+                
+                results.append(frame_results)
+        
+        self.timer.finish_frames([len(frame_results) for frame_results in results])
         
-        # Detect faces
-        face_locations = self.detect_faces(frame)
+        return results
+    
+    def decode_image_bytes(self, image_data: bytes) -> np.ndarray:
+        """
+        Decode encoded image bytes (JPEG/PNG) into an OpenCV frame
         
-        # Analyze each face
-        for face_location in face_locations:
-            top, right, bottom, left = face_location
+        The bytes are wrapped without copying and decoded once, directly
+        into the BGR layout used by detection and ROI extraction.
+        
+        Args:
+            image_data: Raw encoded image bytes
             
-            # Extract face ROI
-            face_roi = frame[top:bottom, left:right]
+        Returns:
+            Image as numpy array (BGR format)
+        """
+        return self._decode_image_bytes(image_data)[0]
+    
+    def _decode_image_bytes(self, image_data: bytes) -> Tuple[np.ndarray, float]:
+        """
+        Decode image bytes, using reduced-size JPEG decoding for oversize frames
+        
+        Args:
+            image_data: Raw encoded image bytes
             
-            # Skip if face is too small
-            if face_roi.shape[0] < 20 or face_roi.shape[1] < 20:
-                continue
+        Returns:
+            Tuple of (frame in BGR format, decoded size / original size)
+        """
+        factor = self._jpeg_reduction_factor(image_data)
+        
+        frame = cv2.imdecode(
+            np.frombuffer(image_data, dtype=np.uint8),
+            JPEG_REDUCED_DECODE_FLAGS.get(factor, cv2.IMREAD_COLOR)
+        )
+        
+        if frame is None:
+            raise ValueError("Could not decode image data")
+        
+        return frame, 1.0 / factor
+    
+    def _jpeg_reduction_factor(self, image_data: bytes) -> int:
+        """
+        Choose the JPEG DCT scaling factor for a frame
+        
+        libjpeg can decode directly at 1/2, 1/4 or 1/8 size, which is much
+        cheaper than decoding the full frame and shrinking it. The largest
+        factor that keeps the frame at least max_frame_width wide is used.
+        
+        Args:
+            image_data: Raw encoded image bytes
+            
+        Returns:
+            Reduction factor (1 = full size decode)
+        """
+        if not self.max_frame_width or not image_data.startswith(b'\xff\xd8'):
+            return 1
+        
+        try:
+            # Only the JPEG header is parsed here - no pixel decoding
+            width = Image.open(BytesIO(image_data)).size[0]
+        except Exception:
+            return 1
+        
+        factor = 1
+        while factor < 8 and width // (factor * 2) >= self.max_frame_width:
+            factor *= 2
+        
+        return factor
+    
+    def decode_base64_image(self, base64_image: str) -> np.ndarray:
+        """
+        Decode a base64 encoded image into an OpenCV frame
+        
+        Args:
+            base64_image: Base64 encoded image string (data URL prefix allowed)
+            
+        Returns:
+            Image as numpy array (BGR format)
+        """
+        return self._decode_image(base64_image)[0]
+    
+    def decode_image(self, image: Union[str, bytes]) -> np.ndarray:
+        """
+        Decode an image given either as base64 string or raw bytes
+        
+        Args:
+            image: Base64 encoded image string or raw encoded image bytes
+            
+        Returns:
+            Image as numpy array (BGR format)
+        """
+        return self._decode_image(image)[0]
+    
+    def _decode_image(self, image: Union[str, bytes]) -> Tuple[np.ndarray, float]:
+        """
+        Decode a base64 string or raw bytes, keeping the decode scale
+        
+        Args:
+            image: Base64 encoded image string or raw encoded image bytes
             
-            # Predict emotion
-            emotion_data = self.predict_emotion(face_roi)
+        Returns:
+            Tuple of (frame in BGR format, decoded size / original size)
+        """
+        with self.timer.stage('decode'):
+            if isinstance(image, str):
+                # Remove data URL prefix if present
+                if ',' in image:
+                    image = image.split(',')[1]
+                
+                # Decode base64 to image bytes
+                image = base64.b64decode(image)
             
-            results.append({
-                'location': {
-                    'top': top,
-                    'right': right,
-                    'bottom': bottom,
-                    'left': left
-                },
-                **emotion_data
-            })
+            return self._decode_image_bytes(image)
+    
+    def _restore_scale(self, results: List[Dict[str, any]], scale: float) -> List[Dict[str, any]]:
+        """
+        Map face locations of a reduced-size decode back to original image coordinates
+        
+        Args:
+            results: Face results of one frame (modified in place)
+            scale: Decoded size / original size
+            
+        Returns:
+            The same results list
+        """
+        if scale != 1.0:
+            for result in results:
+                result['location'] = {
+                    key: int(round(value / scale))
+                    for key, value in result['location'].items()
+                }
         
         return results
     
@@ -196,23 +676,174 @@ class EmotionDetector:
         Returns:
             List of emotion analysis results
         """
-        # Remove data URL prefix if present
-        if ',' in base64_image:
-            base64_image = base64_image.split(',')[1]
+        return self.analyze_images([base64_image])[0]
+    
+    def analyze_base64_images(self, base64_images: List[str]) -> List[List[Dict[str, any]]]:
+        """
+        Analyze emotion from several base64 encoded images in one batch
         
-        # Decode base64 to image
-        image_data = base64.b64decode(base64_image)
-        image = Image.open(BytesIO(image_data))
+        Args:
+            base64_images: List of base64 encoded image strings
+            
+        Returns:
+            List of emotion analysis results, one list per image
+        """
+        return self.analyze_images(base64_images)
+    
+    def analyze_images(self, images: List[Union[str, bytes]]) -> List[List[Dict[str, any]]]:
+        """
+        Analyze emotion from several images (base64 strings or raw bytes) in one batch
+        
+        Face locations are reported in the coordinates of the submitted
+        images, even when an oversize frame was decoded at reduced size.
+        
+        Args:
+            images: List of base64 encoded image strings or raw encoded image bytes
+            
+        Returns:
+            List of emotion analysis results, one list per image
+        """
+        return [results for results, _ in self.analyze_images_tracked(images, [None] * len(images))]
+    
+    def analyze_images_tracked(
+        self,
+        images: List[Union[str, bytes]],
+        tracks: List[Optional[FaceTrack]],
+        detectors: Optional[List[Optional[str]]] = None
+    ) -> List[Tuple[List[Dict[str, any]], Optional[FaceTrack]]]:
+        """
+        Analyze several images in one batch using per-session face tracking
+        
+        Tracking state is returned with the results because this runs in a
+        worker process and the caller owns the session.
+        
+        Args:
+            images: List of base64 encoded image strings or raw encoded image bytes
+            tracks: Tracking state per image (None for untracked images)
+            detectors: Face detector backend name per image (None entries use the default)
+            
+        Returns:
+            List of (results, updated_track) tuples, one per image
+        """
+        decoded = [self._decode_image(image) for image in images]
+        results = self.analyze_frames([frame for frame, _ in decoded], tracks, detectors)
+        
+        return [
+            (self._restore_scale(frame_results, scale), track)
+            for frame_results, (_, scale), track in zip(results, decoded, tracks)
+        ]
+
+    def analyze_video(
+        self,
+        video_path: str,
+        sample_fps: float = 2.0,
+        batch_size: int = 16,
+        redetect_interval: int = 5,
+        sampling: Optional[Tuple[float, float, float]] = None
+    ) -> Dict[str, any]:
+        """
+        Analyze a recorded video and summarize its emotions
+
+        Frames are sampled lazily and analyzed `batch_size` at a time, so
+        memory stays bounded by one batch whatever the video length.
+        Sampled frames are consecutive views of one speaker, so faces are
+        tracked between full detections as in live sessions.
+
+        With adaptive sampling, frames of a static scene are not analyzed
+        and count as a repeat of the last analyzed frame.
+
+        Args:
+            video_path: Path to a video file readable by OpenCV
+            sample_fps: Frames to sample per second of video
+            batch_size: Frames per batched model call
+            redetect_interval: Full face detection every N sampled frames
+            sampling: AdaptiveSampler (min_rate, max_rate, change_threshold),
+                or None to analyze every sampled frame
+
+        Returns:
+            EmotionAggregator snapshot with the run-length encoded `track`
+            and the adaptive `sampling` stats
+        """
+        # Deferred: only video analysis needs these
+        from .aggregation import EmotionAggregator
+        from .sampling import AdaptiveSampler, make_thumbnail
+        from .video import batched, sample_video_frames
+
+        aggregator = EmotionAggregator()
+        track = FaceTrack(redetect_interval) if redetect_interval > 1 else None
+        sampler = AdaptiveSampler(*sampling) if sampling else None
+
+        def candidates():
+            # Frames the sampler skips are passed on as None
+            for timestamp, frame in sample_video_frames(video_path, sample_fps):
+                if sampler is None or sampler.should_analyze(make_thumbnail(frame), timestamp):
+                    yield timestamp, frame
+                else:
+                    yield timestamp, None
+
+        faces = []
+        for batch in batched(candidates(), max(1, batch_size)):
+            frames = [frame for _, frame in batch if frame is not None]
+            results = iter(self.analyze_frames(frames, [track] * len(frames)))
+
+            for timestamp, frame in batch:
+                if frame is not None:
+                    faces = next(results)
+                    if sampler is not None:
+                        height, width = frame.shape[:2]
+                        sampler.track_face(faces[0]['location'] if faces else None, width, height)
+                aggregator.update_faces(faces, timestamp)
+
+        summary = aggregator.snapshot()
+        summary['track'] = aggregator.track()
+        summary['sampling'] = sampler.stats() if sampler else None
+        return summary
+
+    def warm_up(self, batch_sizes: List[int] = (1,)) -> float:
+        """
+        Run dummy inferences so no request pays first-call costs
         
-        # Convert to numpy array
-        frame = np.array(image)
+        Keras traces its predict function per input shape, so every batch
+        size the service uses is run once. Face detection is warmed up too.
         
-        # Convert RGB to BGR if needed (OpenCV format)
-        if len(frame.shape) == 3 and frame.shape[2] == 3:
-            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        Args:
+            batch_sizes: Batch sizes to run through the model
+            
+        Returns:
+            Warm-up duration in seconds
+        """
+        started = time.perf_counter()
+        
+        for batch_size in batch_sizes:
+            self.model.predict(np.zeros((batch_size, 48, 48, 1), dtype=np.float32), verbose=0)
+        
+        # Warm-up work is not pipeline traffic - keep it out of the stage timers
+        timing, self.timer.enabled = self.timer.enabled, False
+        self.detect_faces(np.zeros((240, 320, 3), dtype=np.uint8))
+        self.timer.enabled = timing
+        
+        self.warmup_seconds = time.perf_counter() - started
+        return self.warmup_seconds
+    
+    def model_info(self) -> Dict[str, any]:
+        """
+        Get model lifecycle information
         
-        # Analyze frame
-        return self.analyze_frame(frame)
+        Returns:
+            Dictionary with model version, load and warm-up times, thread
+            pool sizes (0 = library default) and the CPUs the process may use
+        """
+        return {
+            'model_version': self.model_version,
+            'inference_backend': self.inference_backend,
+            'face_detector': self.face_detector,
+            'quantized': getattr(self.model, 'quantized', False),
+            'load_seconds': round(self.load_seconds, 3),
+            'warmup_seconds': round(self.warmup_seconds, 3),
+            'threads': {**self.threads, 'opencv': cv2.getNumThreads()},
+            'cpus': usable_cpus(),
+            'pid': os.getpid()
+        }
     
     def get_sentiment_score(self, emotion: str) -> float:
         """
@@ -224,17 +855,26 @@ class EmotionDetector:
         Returns:
             Sentiment score where negative is bad, positive is good
         """
-        sentiment_mapping = {
-            'happy': 1.0,
-            'surprise': 0.5,
-            'neutral': 0.0,
-            'fear': -0.3,
-            'sad': -0.6,
-            'angry': -0.8,
-            'disgust': -0.9
-        }
+        return SENTIMENT_MAPPING.get(emotion, 0.0)
+
+
+def _weights_version(model_path: str) -> str:
+    """
+    Identify a weights file by name and content hash
+    
+    Args:
+        model_path: Path to model weights
         
-        return sentiment_mapping.get(emotion, 0.0)
+    Returns:
+        Version string like 'emotion_model.h5@1a2b3c4d5e6f'
+    """
+    digest = hashlib.sha256()
+    
+    with open(model_path, 'rb') as weights_file:
+        for chunk in iter(lambda: weights_file.read(1 << 20), b''):
+            digest.update(chunk)
+    
+    return f"{os.path.basename(model_path)}@{digest.hexdigest()[:12]}"
 
 
 # Singleton instance
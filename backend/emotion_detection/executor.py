@@ -0,0 +1,353 @@
+"""
+Emotion Execution Backend
+Runs CPU-heavy emotion inference in a dedicated process pool so the
+asyncio event loop of the API worker is never blocked by vision work
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from .metrics import PipelineMetrics
+from .runtime import pin_to_cpus, usable_cpus, worker_cpu_sets
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(__file__), "emotion_model.h5")
+
+# Inference-only artifact written by emotion_detection.export_model
+DEFAULT_INFERENCE_MODEL_PATH = os.path.join(os.path.dirname(__file__), "emotion_model.tflite")
+
+
+def resolve_model_path(model_path: Optional[str] = None) -> Optional[str]:
+    """
+    Resolve the emotion model path
+
+    Without a configured path the exported inference artifact is
+    preferred over the Keras training weights.
+
+    Args:
+        model_path: Configured model path (empty for the bundled defaults)
+
+    Returns:
+        Path to an existing model file, or None to use an untrained model
+    """
+    candidates = [model_path] if model_path else [DEFAULT_INFERENCE_MODEL_PATH, DEFAULT_MODEL_PATH]
+
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+
+    print(f"Warning: Model weights not found at {candidates[-1]}. Using untrained model.")
+    return None
+
+
+# ============================================================================
+# Worker process side
+# ============================================================================
+
+# Detector owned by the current worker process
+_worker_detector = None
+
+
+def _init_worker(
+    model_path: Optional[str],
+    detector_options: Dict[str, Any],
+    warmup_batch_sizes: List[int],
+    cpu_sets: Optional[List[List[int]]] = None,
+    worker_counter: Optional[Any] = None
+) -> None:
+    """
+    Process pool initializer - builds and warms up one EmotionDetector per worker
+
+    Args:
+        model_path: Resolved path to model weights (None for untrained)
+        detector_options: Extra EmotionDetector keyword arguments
+        warmup_batch_sizes: Batch sizes to run through the model before serving
+        cpu_sets: CPUs per worker slot (None = no pinning)
+        worker_counter: Shared counter that hands out worker slots
+    """
+    global _worker_detector
+
+    # Pin before any library starts its thread pools
+    if cpu_sets:
+        with worker_counter.get_lock():
+            slot = worker_counter.value
+            worker_counter.value += 1
+        pin_to_cpus(cpu_sets[slot % len(cpu_sets)])
+
+    from emotion_detection.emotion_detector import EmotionDetector
+
+    _worker_detector = EmotionDetector(model_path, **detector_options)
+    _worker_detector.warm_up(warmup_batch_sizes)
+
+
+def _run_in_worker(method: str, args: tuple, stage_timing: bool = True) -> tuple:
+    """
+    Call a method of the worker's EmotionDetector
+
+    Args:
+        method: EmotionDetector method name
+        args: Positional arguments for the method
+        stage_timing: Whether the detector should time its pipeline stages
+
+    Returns:
+        Tuple of (method result, drained stage timings or None); both picklable
+    """
+    _worker_detector.timer.enabled = stage_timing
+    result = getattr(_worker_detector, method)(*args)
+
+    return result, _worker_detector.timer.drain()
+
+
+def _probe_worker(hold_seconds: float) -> Dict[str, Any]:
+    """
+    Report the worker's model info, holding the worker briefly so that
+    concurrent probes are picked up by other workers
+
+    Args:
+        hold_seconds: Time to keep this worker busy
+
+    Returns:
+        EmotionDetector.model_info() of this worker
+    """
+    time.sleep(hold_seconds)
+    return _worker_detector.model_info()
+
+
+# ============================================================================
+# API process side
+# ============================================================================
+
+class EmotionExecutor:
+    """
+    Process pool where each worker holds its own EmotionDetector.
+
+    Routes await `run()` instead of calling the detector directly, so
+    base64 decoding, face detection and TensorFlow inference happen off
+    the event loop.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        model_path: Optional[str] = None,
+        detector_options: Optional[Dict[str, Any]] = None,
+        warmup_batch_sizes: Optional[List[int]] = None,
+        stage_timing: bool = True,
+        worker_cpus: Optional[List[int]] = None,
+        pin_workers: bool = False
+    ):
+        """
+        Args:
+            max_workers: Number of worker processes
+            model_path: Configured weights path (empty for the bundled default)
+            detector_options: Extra EmotionDetector keyword arguments
+                (e.g. detection_width, detection_upsample, detection_model)
+            warmup_batch_sizes: Batch sizes each worker runs before serving
+            stage_timing: Whether workers time pipeline stages (toggle via metrics.enabled)
+            worker_cpus: CPUs the workers may run on (None = all usable CPUs)
+            pin_workers: Pin each worker to its own share of those CPUs
+        """
+        self.max_workers = max(1, max_workers)
+        self.worker_cpus = list(worker_cpus) if worker_cpus else None
+        self.pin_workers = pin_workers
+        self.model_path = model_path
+        self.detector_options = detector_options or {}
+        self.warmup_batch_sizes = list(warmup_batch_sizes or [1])
+        self.worker_info: List[Dict[str, Any]] = []
+        self.metrics = PipelineMetrics(stage_timing)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+
+    def start(self) -> None:
+        """Start the worker processes (no-op if already running)"""
+        if self._pool is not None:
+            return
+
+        # Spawn (not fork) so workers never inherit TensorFlow state
+        context = multiprocessing.get_context("spawn")
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(
+                resolve_model_path(self.model_path),
+                self.detector_options,
+                self.warmup_batch_sizes,
+                self.cpu_sets(),
+                context.Value('i', 0),
+            ),
+        )
+
+    def cpu_sets(self) -> Optional[List[List[int]]]:
+        """
+        CPUs per worker slot
+
+        Returns:
+            One CPU list per worker when pinning, a single shared list when
+            only restricting to worker_cpus, or None for no affinity changes
+        """
+        if self.pin_workers:
+            return worker_cpu_sets(self.worker_cpus or usable_cpus(), self.max_workers)
+        if self.worker_cpus:
+            return [self.worker_cpus]
+        return None
+
+    async def warm_up(self, timeout: float = 300.0) -> List[Dict[str, Any]]:
+        """
+        Start every worker process and wait until its model is loaded and warm
+
+        Workers are spawned on demand and build and warm up their detector
+        in the pool initializer. One probe per worker is submitted in rounds
+        until every worker process has answered.
+
+        Args:
+            timeout: Maximum time to wait for all workers
+
+        Returns:
+            Model info reported by the workers (version, load and warm-up times)
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        workers: Dict[int, Dict[str, Any]] = {}
+
+        while len(workers) < self.max_workers and loop.time() < deadline:
+            infos = await asyncio.gather(*(
+                loop.run_in_executor(self._pool, _probe_worker, 0.5)
+                for _ in range(self.max_workers)
+            ))
+            workers.update((info['pid'], info) for info in infos)
+
+        self.worker_info = list(workers.values())
+        return self.worker_info
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker pool is started"""
+        return self._pool is not None
+
+    async def run(self, method: str, *args) -> Any:
+        """
+        Run an EmotionDetector method in a worker process
+
+        Args:
+            method: EmotionDetector method name (e.g. 'analyze_base64_image')
+            *args: Positional arguments for the method
+
+        Returns:
+            Method result
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+
+        self._in_flight += 1
+        try:
+            result, timings = await loop.run_in_executor(
+                self._pool, _run_in_worker, method, args, self.metrics.enabled
+            )
+            self.metrics.merge(timings)
+            self._completed += 1
+            return result
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM) - replace the pool for later requests
+            self._failed += 1
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            raise
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+    @property
+    def model_version(self) -> Optional[str]:
+        """Version of the loaded weights (None before warm-up)"""
+        return self.model_info()["model_version"]
+
+    def model_info(self) -> Dict[str, Any]:
+        """
+        Get model lifecycle information collected during warm-up
+
+        Returns:
+            Dictionary with model version, warm state, per-worker timings
+            and the CPU sets workers are pinned to
+        """
+        versions = sorted({info['model_version'] for info in self.worker_info})
+
+        return {
+            "warm": bool(self.worker_info),
+            "model_version": ", ".join(versions) or None,
+            "warmup_batch_sizes": self.warmup_batch_sizes,
+            "cpu_sets": self.cpu_sets(),
+            "workers": self.worker_info,
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get pool load statistics
+
+        Returns:
+            Dictionary with worker count, busy workers and queue depth
+        """
+        busy_workers = min(self._in_flight, self.max_workers)
+
+        return {
+            "workers": self.max_workers if self.running else 0,
+            "busy_workers": busy_workers,
+            "queue_depth": self._in_flight - busy_workers,
+            "completed": self._completed,
+            "failed": self._failed,
+        }
+
+
+# Singleton instance
+_emotion_executor: Optional[EmotionExecutor] = None
+
+
+def get_emotion_executor(
+    max_workers: int = 2,
+    model_path: Optional[str] = None,
+    detector_options: Optional[Dict[str, Any]] = None,
+    warmup_batch_sizes: Optional[List[int]] = None,
+    stage_timing: bool = True,
+    worker_cpus: Optional[List[int]] = None,
+    pin_workers: bool = False
+) -> EmotionExecutor:
+    """
+    Get singleton instance of the emotion executor
+
+    Args:
+        max_workers: Number of worker processes (only used on first call)
+        model_path: Path to model weights (only used on first call)
+        detector_options: EmotionDetector keyword arguments (only used on first call)
+        warmup_batch_sizes: Warm-up batch sizes (only used on first call)
+        stage_timing: Initial pipeline stage timing state (only used on first call)
+        worker_cpus: CPUs the workers may run on (only used on first call)
+        pin_workers: Pin each worker to its own CPUs (only used on first call)
+
+    Returns:
+        EmotionExecutor instance
+    """
+    global _emotion_executor
+
+    if _emotion_executor is None:
+        _emotion_executor = EmotionExecutor(
+            max_workers, model_path, detector_options, warmup_batch_sizes, stage_timing,
+            worker_cpus, pin_workers
+        )
+
+    return _emotion_executor
@@ -0,0 +1,246 @@
+"""
+Emotion Model Export
+Freezes trained Keras weights into an inference-only TFLite artifact
+
+The exported file holds only the forward graph and its weights (no
+optimizer, loss or dropout), and is memory-mapped by the detector at
+load time so worker processes share its pages. With --quantize int8 the
+network is post-training quantized using a calibration image set, and an
+accuracy-delta report against the float model is printed.
+
+Usage:
+    python -m emotion_detection.export_model
+    python -m emotion_detection.export_model --weights emotion_model.h5 --output emotion_model.tflite
+    python -m emotion_detection.export_model --quantize int8 --calibration data/train --eval data/test
+
+Calibration/eval directories may contain webcam frames (faces are
+detected) or face crops; images inside folders named after an emotion
+label (e.g. data/test/happy/*.png, FER-2013 layout) are used as labeled
+samples for the accuracy report.
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .face_detectors import FACE_DETECTORS
+from .labels import EMOTION_LABELS
+from .executor import DEFAULT_INFERENCE_MODEL_PATH, DEFAULT_MODEL_PATH
+
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def load_face_samples(
+    directory: str,
+    max_samples: int = 500,
+    face_detector: str = 'dlib'
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Load preprocessed face samples from an image directory
+
+    Args:
+        directory: Directory searched recursively for images
+        max_samples: Maximum number of faces to load
+        face_detector: Face detector backend for frames (see face_detectors module)
+
+    Returns:
+        Tuple of (faces as (N, 48, 48, 1) float32, label indices or None
+        if any sample is unlabeled)
+    """
+    from .emotion_detector import FaceExtractor
+
+    # Only face detection and preprocessing are used - no CNN is loaded
+    extractor = FaceExtractor(face_detector=face_detector)
+
+    faces, labels = [], []
+
+    for root, _, files in os.walk(directory):
+        label = os.path.basename(root).lower()
+
+        for name in sorted(files):
+            if len(faces) >= max_samples:
+                break
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+
+            image = cv2.imread(os.path.join(root, name))
+            if image is None:
+                continue
+
+            # Small images are treated as face crops, larger ones as frames
+            if min(image.shape[:2]) <= 96:
+                rois = [image]
+            else:
+                rois = [roi for _, roi in extractor.extract_faces(image)]
+
+            for roi in rois:
+                faces.append(extractor.preprocess_face(roi)[0])
+                labels.append(EMOTION_LABELS.index(label) if label in EMOTION_LABELS else -1)
+
+    if not faces:
+        raise ValueError(f"No face samples found in {directory}")
+
+    samples = np.asarray(faces, dtype=np.float32)
+    label_array = np.asarray(labels)
+
+    return samples, (label_array if (label_array >= 0).all() else None)
+
+
+def export_model(
+    weights_path: Optional[str],
+    output_path: str,
+    quantize: str = 'none',
+    calibration_samples: Optional[np.ndarray] = None
+) -> str:
+    """
+    Export the emotion CNN to an inference-only TFLite file
+
+    Args:
+        weights_path: Trained Keras weights (.h5), or None for an untrained model
+        output_path: Destination .tflite path
+        quantize: 'none' for float32, 'int8' for full-integer post-training quantization
+        calibration_samples: Preprocessed faces used to calibrate int8 ranges
+
+    Returns:
+        The output path
+    """
+    import tensorflow as tf
+    from .emotion_detector import EmotionDetector
+
+    detector = EmotionDetector(weights_path, inference_backend='keras')
+    converter = tf.lite.TFLiteConverter.from_keras_model(detector.model)
+
+    if quantize == 'int8':
+        if calibration_samples is None or not len(calibration_samples):
+            raise ValueError("int8 quantization needs calibration samples")
+
+        def representative_dataset():
+            for sample in calibration_samples:
+                yield [sample[np.newaxis].astype(np.float32)]
+
+        # Integer-only kernels; float32 input/output keeps the predict() contract
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    elif quantize != 'none':
+        raise ValueError(f"Unknown quantization mode '{quantize}'. Choose 'none' or 'int8'")
+
+    flatbuffer = converter.convert()
+
+    with open(output_path, 'wb') as output_file:
+        output_file.write(flatbuffer)
+
+    print(
+        f"Exported {detector.model_version} model ({quantize}) to {output_path} "
+        f"({len(flatbuffer) / 1e6:.1f} MB)"
+    )
+    return output_path
+
+
+def _per_frame_ms(model, samples: np.ndarray, repeat: int = 50) -> float:
+    """Mean single-face inference latency in milliseconds"""
+    batch = samples[:1]
+    model.predict(batch, verbose=0)
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        model.predict(batch, verbose=0)
+
+    return (time.perf_counter() - started) / repeat * 1000.0
+
+
+def accuracy_report(
+    reference_model,
+    candidate_model,
+    samples: np.ndarray,
+    labels: Optional[np.ndarray] = None
+) -> Dict[str, float]:
+    """
+    Compare a candidate (e.g. quantized) model against the float reference
+
+    Args:
+        reference_model: Float model with a predict() method
+        candidate_model: Model under evaluation with a predict() method
+        samples: Preprocessed faces (N, 48, 48, 1)
+        labels: Optional ground-truth label indices
+
+    Returns:
+        Report with top-1 agreement, probability deltas, accuracies
+        (when labeled) and per-frame latency
+    """
+    reference = reference_model.predict(samples, verbose=0)
+    candidate = candidate_model.predict(samples, verbose=0)
+
+    report = {
+        'samples': int(len(samples)),
+        'top1_agreement': float(np.mean(reference.argmax(axis=1) == candidate.argmax(axis=1))),
+        'mean_abs_prob_delta': float(np.mean(np.abs(reference - candidate))),
+        'max_abs_prob_delta': float(np.max(np.abs(reference - candidate))),
+        'reference_ms_per_frame': _per_frame_ms(reference_model, samples),
+        'candidate_ms_per_frame': _per_frame_ms(candidate_model, samples),
+    }
+
+    if labels is not None:
+        report['reference_accuracy'] = float(np.mean(reference.argmax(axis=1) == labels))
+        report['candidate_accuracy'] = float(np.mean(candidate.argmax(axis=1) == labels))
+        report['accuracy_delta'] = report['candidate_accuracy'] - report['reference_accuracy']
+
+    return report
+
+
+def print_report(report: Dict[str, float]) -> None:
+    """Print an accuracy-delta report"""
+    print("\nAccuracy report (candidate vs. float reference)")
+    print("-" * 48)
+    for key, value in report.items():
+        formatted = f"{value:.4f}" if isinstance(value, float) else str(value)
+        print(f"{key:>24}: {formatted}")
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the emotion model for inference")
+    parser.add_argument("--weights", default=DEFAULT_MODEL_PATH, help="Trained Keras weights (.h5)")
+    parser.add_argument("--output", default=DEFAULT_INFERENCE_MODEL_PATH, help="Output .tflite path")
+    parser.add_argument("--quantize", choices=["none", "int8"], default="none")
+    parser.add_argument("--calibration", help="Calibration image directory (required for int8)")
+    parser.add_argument("--eval", help="Evaluation image directory for the accuracy report")
+    parser.add_argument("--max-samples", type=int, default=500)
+    parser.add_argument("--face-detector", choices=FACE_DETECTORS, default="dlib",
+                        help="Face detector for calibration/eval frames")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.weights):
+        print(f"Error: weights file not found: {args.weights}")
+        return 1
+
+    calibration = None
+    if args.quantize == 'int8':
+        if not args.calibration:
+            print("Error: --calibration is required for int8 quantization")
+            return 1
+        calibration, _ = load_face_samples(args.calibration, args.max_samples, args.face_detector)
+        print(f"Loaded {len(calibration)} calibration faces")
+
+    export_model(args.weights, args.output, args.quantize, calibration)
+
+    eval_dir = args.eval or args.calibration
+    if eval_dir:
+        from .emotion_detector import EmotionDetector
+        from .runtime import TFLiteModel
+
+        samples, labels = load_face_samples(eval_dir, args.max_samples, args.face_detector)
+        reference = EmotionDetector(args.weights, inference_backend='keras').model
+        print_report(accuracy_report(reference, TFLiteModel(args.output), samples, labels))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
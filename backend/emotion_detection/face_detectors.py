@@ -0,0 +1,211 @@
+"""
+Face Detector Backends
+Pluggable face detectors for EmotionDetector, all returning
+(top, right, bottom, left) boxes
+
+Backends:
+    - dlib: face_recognition (dlib HOG, or its CNN with model='cnn').
+            Most accurate on frontal webcam faces, slowest on CPU.
+    - haar: OpenCV Haar cascade (bundled with opencv-python). Very fast,
+            more false positives and misses on turned or poorly lit faces.
+    - lbp:  OpenCV LBP cascade. Faster than Haar, slightly less accurate.
+            Needs the cascade XML from the OpenCV repository (lbp_cascade).
+    - dnn:  OpenCV DNN ResNet-10 SSD (res10_300x300). Robust to pose and
+            lighting at a few milliseconds per frame. Needs the Caffe
+            prototxt and weights (dnn_prototxt, dnn_weights).
+"""
+
+import os
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+
+FACE_DETECTORS = ('dlib', 'haar', 'lbp', 'dnn')
+
+# Default model files for the backends that do not ship with a pip package
+MODELS_DIR = os.path.join(os.path.dirname(__file__), "models")
+DEFAULT_LBP_CASCADE = os.path.join(MODELS_DIR, "lbpcascade_frontalface_improved.xml")
+DEFAULT_DNN_PROTOTXT = os.path.join(MODELS_DIR, "deploy.prototxt")
+DEFAULT_DNN_WEIGHTS = os.path.join(MODELS_DIR, "res10_300x300_ssd_iter_140000.caffemodel")
+
+
+class DlibFaceDetector:
+    """dlib detector through face_recognition (HOG or CNN)"""
+
+    def __init__(self, upsample: int = 1, model: str = 'hog'):
+        """
+        Args:
+            upsample: face_recognition number_of_times_to_upsample
+            model: face_recognition detection model ('hog' or 'cnn')
+        """
+        # Imported here so deployments using OpenCV detectors do not need dlib
+        import face_recognition
+
+        self._face_locations = face_recognition.face_locations
+        self.upsample = upsample
+        self.model = model
+
+        # dlib HOG picks the strongest gradient across channels, so it is
+        # channel-order invariant and can run on the BGR buffer directly.
+        # The CNN detector was trained on RGB and needs the conversion.
+        self.color_mode = 'rgb' if model == 'cnn' else 'bgr'
+
+    def detect(self, image: np.ndarray) -> List[tuple]:
+        """
+        Detect faces
+
+        Args:
+            image: Frame in this detector's color_mode
+
+        Returns:
+            List of (top, right, bottom, left) boxes
+        """
+        return self._face_locations(image, number_of_times_to_upsample=self.upsample, model=self.model)
+
+
+class CascadeFaceDetector:
+    """OpenCV Haar or LBP cascade classifier"""
+
+    color_mode = 'gray'
+
+    def __init__(self, cascade_path: str, min_face_size: int = 40):
+        """
+        Args:
+            cascade_path: Cascade XML file
+            min_face_size: Smallest face (pixels, at detection scale) to report
+        """
+        # OpenCV 5 moved cascade classifiers out of the main package
+        if not hasattr(cv2, 'CascadeClassifier'):
+            raise ImportError(
+                f"OpenCV {cv2.__version__} has no CascadeClassifier; "
+                "install opencv-python<5 or use the 'dlib' or 'dnn' face detector"
+            )
+
+        self.cascade = cv2.CascadeClassifier(cascade_path)
+        if self.cascade.empty():
+            raise ValueError(f"Could not load face cascade from {cascade_path}")
+
+        self.min_face_size = min_face_size
+
+    def detect(self, image: np.ndarray) -> List[tuple]:
+        """
+        Detect faces
+
+        Args:
+            image: Grayscale frame
+
+        Returns:
+            List of (top, right, bottom, left) boxes
+        """
+        faces = self.cascade.detectMultiScale(
+            image,
+            scaleFactor=1.1,
+            minNeighbors=5,
+            minSize=(self.min_face_size, self.min_face_size)
+        )
+
+        return [(int(y), int(x + w), int(y + h), int(x)) for x, y, w, h in faces]
+
+
+class DnnFaceDetector:
+    """OpenCV DNN single-shot detector (ResNet-10 SSD, 300x300 input)"""
+
+    color_mode = 'bgr'
+
+    # Mean BGR values the res10 SSD was trained with
+    MEAN = (104.0, 177.0, 123.0)
+
+    def __init__(
+        self,
+        dnn_prototxt: str = DEFAULT_DNN_PROTOTXT,
+        dnn_weights: str = DEFAULT_DNN_WEIGHTS,
+        confidence: float = 0.5
+    ):
+        """
+        Args:
+            dnn_prototxt: Caffe network definition
+            dnn_weights: Caffe weights
+            confidence: Minimum detection confidence
+        """
+        if not (os.path.exists(dnn_prototxt) and os.path.exists(dnn_weights)):
+            raise ValueError(
+                f"DNN face detector files not found ({dnn_prototxt}, {dnn_weights}). "
+                "See EMOTION_DETECTION_README.md for download links."
+            )
+
+        self.net = cv2.dnn.readNetFromCaffe(dnn_prototxt, dnn_weights)
+        self.confidence = confidence
+
+    def detect(self, image: np.ndarray) -> List[tuple]:
+        """
+        Detect faces
+
+        Args:
+            image: BGR frame
+
+        Returns:
+            List of (top, right, bottom, left) boxes
+        """
+        height, width = image.shape[:2]
+        blob = cv2.dnn.blobFromImage(cv2.resize(image, (300, 300)), 1.0, (300, 300), self.MEAN)
+
+        self.net.setInput(blob)
+        detections = self.net.forward()[0, 0]
+
+        faces = []
+        for _, _, score, x1, y1, x2, y2 in detections:
+            if score < self.confidence:
+                continue
+
+            left, top = max(0, int(x1 * width)), max(0, int(y1 * height))
+            right, bottom = min(width, int(x2 * width)), min(height, int(y2 * height))
+            if right > left and bottom > top:
+                faces.append((top, right, bottom, left))
+
+        return faces
+
+
+def create_face_detector(
+    name: str,
+    upsample: int = 1,
+    model: str = 'hog',
+    lbp_cascade: Optional[str] = None,
+    dnn_prototxt: Optional[str] = None,
+    dnn_weights: Optional[str] = None,
+    dnn_confidence: float = 0.5
+):
+    """
+    Create a face detector backend
+
+    Args:
+        name: One of FACE_DETECTORS
+        upsample: dlib upsampling (dlib only)
+        model: dlib model, 'hog' or 'cnn' (dlib only)
+        lbp_cascade: LBP cascade XML (lbp; defaults to models/)
+        dnn_prototxt: Caffe network definition (dnn; defaults to models/)
+        dnn_weights: Caffe weights (dnn; defaults to models/)
+        dnn_confidence: Minimum detection confidence (dnn only)
+
+    Returns:
+        Detector with a `color_mode` ('bgr', 'rgb' or 'gray') and detect(image)
+    """
+    if name == 'dlib':
+        return DlibFaceDetector(upsample=upsample, model=model)
+
+    if name == 'haar':
+        cascades = getattr(getattr(cv2, 'data', None), 'haarcascades', '')
+        return CascadeFaceDetector(os.path.join(cascades, "haarcascade_frontalface_default.xml"))
+
+    if name == 'lbp':
+        return CascadeFaceDetector(lbp_cascade or DEFAULT_LBP_CASCADE)
+
+    if name == 'dnn':
+        return DnnFaceDetector(
+            dnn_prototxt or DEFAULT_DNN_PROTOTXT,
+            dnn_weights or DEFAULT_DNN_WEIGHTS,
+            dnn_confidence
+        )
+
+    raise ValueError(f"Unknown face detector '{name}'. Choose from: {', '.join(FACE_DETECTORS)}")
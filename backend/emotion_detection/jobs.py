@@ -0,0 +1,346 @@
+"""
+Emotion Analysis Jobs
+Background jobs for long emotion timelines and videos: the request returns a
+job id at once, the frames are analyzed in the emotion pool with progress
+updates, and the finished result is kept for a TTL to be polled or streamed
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+# Job lifecycle states
+JOB_STATES = ('queued', 'running', 'done', 'failed')
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are queued or running to accept another"""
+
+
+class EmotionJob:
+    """
+    One background analysis job and its progress.
+
+    Every state change wakes up the coroutines waiting in `changes()`, so
+    progress can be pushed to event stream clients as it happens.
+    """
+
+    def __init__(self, kind: str, total: Optional[int] = None, owner: Optional[int] = None):
+        """
+        Args:
+            kind: What is analyzed ("frames" or "video")
+            total: Number of frames to analyze, if known up front
+            owner: ID of the user who submitted the job
+        """
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.owner = owner
+        self.status = 'queued'
+        self.processed = 0
+        self.total = total
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+        self._changed = asyncio.Event()
+        self._body: Optional[bytes] = None
+
+    @property
+    def finished(self) -> bool:
+        """Whether the job is done or failed"""
+        return self.status in ('done', 'failed')
+
+    def start(self) -> None:
+        """Mark the job as running"""
+        self.status = 'running'
+        self._notify()
+
+    def progress(self, processed: int) -> None:
+        """
+        Report analyzed frames
+
+        Args:
+            processed: Frames analyzed so far
+        """
+        self.processed = processed
+        self._notify()
+
+    def finish(self, result: Dict[str, Any]) -> None:
+        """
+        Store the result of a completed job
+
+        Args:
+            result: JSON-serializable analysis result
+        """
+        self.result = result
+        self.status = 'done'
+        self.finished_at = time.time()
+        self._notify()
+
+    def fail(self, error: str) -> None:
+        """
+        Mark the job as failed
+
+        Args:
+            error: Error message for the client
+        """
+        self.error = error
+        self.status = 'failed'
+        self.finished_at = time.time()
+        self._notify()
+
+    def _notify(self) -> None:
+        """Wake up everyone waiting for a change"""
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def changes(self, keepalive: float = 15.0) -> AsyncIterator[Optional['EmotionJob']]:
+        """
+        Follow the job until it finishes
+
+        Args:
+            keepalive: Seconds without a change before yielding None
+
+        Yields:
+            The job after each change (first its current state), or None
+            when nothing changed for `keepalive` seconds
+        """
+        # Taken before yielding, so changes made meanwhile are not missed
+        changed = self._changed
+        yield self
+
+        while not self.finished:
+            try:
+                await asyncio.wait_for(changed.wait(), keepalive)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            changed = self._changed
+            yield self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the job state
+
+        Returns:
+            Dictionary with id, status, progress, and the result or error once finished
+        """
+        state = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'processed': self.processed,
+            'total': self.total,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+        if self.status == 'done':
+            state['result'] = self.result
+        elif self.status == 'failed':
+            state['error'] = self.error
+
+        return state
+
+    def render(self) -> bytes:
+        """
+        Get the job state as JSON
+
+        The body of a finished job is encoded once, so polling its result
+        again costs no serialization.
+
+        Returns:
+            UTF-8 JSON bytes
+        """
+        if self._body is not None:
+            return self._body
+
+        body = json.dumps(self.to_dict()).encode()
+        if self.finished:
+            self._body = body
+
+        return body
+
+
+class JobStore:
+    """
+    Registry and runner of background emotion jobs.
+
+    At most `concurrency` jobs analyze at once, the rest wait as queued;
+    beyond `max_pending` unfinished jobs new ones are refused. Finished
+    jobs are kept for `ttl_seconds` and then forgotten.
+    """
+
+    def __init__(self, concurrency: int = 2, max_pending: int = 32, ttl_seconds: float = 600.0):
+        """
+        Args:
+            concurrency: Jobs analyzed at once
+            max_pending: Maximum queued plus running jobs (0 = unlimited)
+            ttl_seconds: How long finished results are kept
+        """
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+
+        self._jobs: "OrderedDict[str, EmotionJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.completed = 0
+        self.failed = 0
+        self.expired = 0
+
+    def submit(
+        self,
+        kind: str,
+        work: Callable[[EmotionJob], Awaitable[Dict[str, Any]]],
+        total: Optional[int] = None,
+        owner: Optional[int] = None
+    ) -> EmotionJob:
+        """
+        Queue a job and start it in the background
+
+        Args:
+            kind: What is analyzed ("frames" or "video")
+            work: Coroutine function doing the analysis; it may report
+                progress on the job and returns the result
+            total: Number of frames to analyze, if known up front
+            owner: ID of the user who submitted the job
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFull: If max_pending jobs are already unfinished
+        """
+        self._purge()
+
+        if self.max_pending and len(self._tasks) >= self.max_pending:
+            raise JobQueueFull(f"{len(self._tasks)} emotion jobs are already pending")
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(max(1, self.concurrency))
+
+        job = EmotionJob(kind, total, owner)
+        self._jobs[job.id] = job
+        self._tasks[job.id] = asyncio.ensure_future(self._run(job, work))
+
+        return job
+
+    async def _run(self, job: EmotionJob, work: Callable[[EmotionJob], Awaitable[Dict[str, Any]]]) -> None:
+        """Run one job once a slot is free and record its outcome"""
+        try:
+            async with self._slots:
+                job.start()
+                result = await work(job)
+            job.finish(result)
+            self.completed += 1
+        except asyncio.CancelledError:
+            job.fail("Job cancelled")
+            self.failed += 1
+            raise
+        except Exception as e:
+            print(f"Error in emotion job {job.id}: {e}")
+            job.fail(str(e))
+            self.failed += 1
+        finally:
+            self._tasks.pop(job.id, None)
+
+    def get(self, job_id: str) -> Optional[EmotionJob]:
+        """
+        Look up a job
+
+        Args:
+            job_id: Id returned by submit
+
+        Returns:
+            The job, or None if it is unknown or its result expired
+        """
+        self._purge()
+        return self._jobs.get(job_id)
+
+    def _purge(self) -> None:
+        """Forget finished jobs older than the TTL"""
+        cutoff = time.time() - self.ttl_seconds
+
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
+            self.expired += 1
+
+    def shutdown(self) -> None:
+        """Cancel all unfinished jobs"""
+        for task in list(self._tasks.values()):
+            task.cancel()
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get job statistics
+
+        Returns:
+            Dictionary with jobs per state and completion counters
+        """
+        self._purge()
+        states = {state: 0 for state in JOB_STATES}
+        for job in self._jobs.values():
+            states[job.status] += 1
+
+        return {
+            'concurrency': self.concurrency,
+            'max_pending': self.max_pending,
+            'jobs': states,
+            'completed': self.completed,
+            'failed': self.failed,
+            'expired': self.expired,
+        }
+
+    def render_prometheus(self) -> str:
+        """
+        Render job gauges and counters in the Prometheus text exposition format
+
+        Returns:
+            Metrics text
+        """
+        states = self.stats()['jobs']
+        lines = [
+            '# HELP emotion_jobs Emotion analysis jobs retained by state',
+            '# TYPE emotion_jobs gauge',
+        ]
+        lines += [f'emotion_jobs{{state="{state}"}} {count}' for state, count in states.items()]
+        lines += [
+            '# HELP emotion_jobs_finished_total Emotion analysis jobs finished by outcome',
+            '# TYPE emotion_jobs_finished_total counter',
+            f'emotion_jobs_finished_total{{outcome="done"}} {self.completed}',
+            f'emotion_jobs_finished_total{{outcome="failed"}} {self.failed}',
+        ]
+
+        return '\n'.join(lines) + '\n'
+
+
+# Singleton instance
+_job_store: Optional[JobStore] = None
+
+
+def get_job_store(concurrency: int = 2, max_pending: int = 32, ttl_seconds: float = 600.0) -> JobStore:
+    """
+    Get singleton instance of the job store
+
+    Args:
+        concurrency: Jobs analyzed at once (only used on first call)
+        max_pending: Maximum unfinished jobs (only used on first call)
+        ttl_seconds: How long finished results are kept (only used on first call)
+
+    Returns:
+        JobStore instance
+    """
+    global _job_store
+
+    if _job_store is None:
+        _job_store = JobStore(concurrency, max_pending, ttl_seconds)
+
+    return _job_store
@@ -0,0 +1,20 @@
+"""
+Emotion Labels
+Model output labels and their sentiment scores, kept free of heavy imports
+so API-side modules (aggregation, sessions, routes) can use them without
+loading OpenCV or the model runtime
+"""
+
+# Emotion labels in model output order
+EMOTION_LABELS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+# Sentiment score per emotion (-1 to 1)
+SENTIMENT_MAPPING = {
+    'happy': 1.0,
+    'surprise': 0.5,
+    'neutral': 0.0,
+    'fear': -0.3,
+    'sad': -0.6,
+    'angry': -0.8,
+    'disgust': -0.9
+}
@@ -0,0 +1,361 @@
+"""
+Emotion Detection Metrics
+Lightweight fixed-bucket histograms for tuning the emotion pipeline, and
+per-stage latency timers exported in the Prometheus text format
+"""
+
+import bisect
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+
+# Number of frames per model call
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+# Seconds a frame waited before its batch was flushed
+QUEUE_WAIT_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25)
+
+# Seconds a single frame spent in one pipeline stage
+STAGE_LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5
+)
+
+# Faces found in a frame
+FACES_PER_FRAME_BUCKETS = (0, 1, 2, 3, 4, 8)
+
+# EmotionDetector pipeline stages, in processing order
+PIPELINE_STAGES = ('decode', 'color', 'detect', 'preprocess', 'infer', 'postprocess')
+
+# Quantiles exported for every stage
+STAGE_QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram (Prometheus-style upper bounds).
+
+    Observing a value is a binary search plus one increment, so it is
+    cheap enough to call on every frame.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Args:
+            buckets: Sorted bucket upper bounds (an implicit +Inf bucket is added)
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float, times: int = 1) -> None:
+        """
+        Record a value
+
+        Args:
+            value: Observed value
+            times: Number of observations of this value
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += times
+        self.count += times
+        self.sum += value * times
+
+    def merge(self, counts: Sequence[int], total: float) -> None:
+        """
+        Add the raw state of a histogram with the same buckets
+
+        Args:
+            counts: Per-bucket (non-cumulative) counts, including +Inf
+            total: Sum of the observed values
+        """
+        for index, bucket_count in enumerate(counts):
+            self.counts[index] += bucket_count
+        self.count += sum(counts)
+        self.sum += total
+
+    def reset(self) -> None:
+        """Forget all observations"""
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by linear interpolation within its bucket
+
+        Same estimate as Prometheus histogram_quantile(); values in the
+        +Inf bucket are reported as the largest finite bound.
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Estimated value (0.0 without observations)
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                if index == len(self.buckets):
+                    return float(self.buckets[-1])
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+
+        return float(self.buckets[-1])
+
+    def snapshot(self) -> Dict:
+        """
+        Get histogram state
+
+        Returns:
+            Dictionary with cumulative bucket counts, total count and sum
+        """
+        cumulative = 0
+        buckets = {}
+
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            cumulative += bucket_count
+            buckets[str(bound)] = cumulative
+
+        buckets["+Inf"] = self.count
+
+        return {
+            "buckets": buckets,
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else 0.0,
+        }
+
+
+class StageTimer:
+    """
+    Per-stage latency timers for one EmotionDetector.
+
+    Stage times are exclusive: time spent in a nested stage (e.g. color
+    conversion inside detection) is not counted again in the outer one.
+    Times accumulate until `finish_frames()`, which records them as
+    per-frame latencies, so a batch of N frames contributes its stage
+    time / N once per frame. Observations are cheap, and `drain()` hands
+    them to the API process (see PipelineMetrics) and starts over.
+    When disabled, `stage()` does no timing at all.
+    """
+
+    def __init__(self, enabled: bool = True):
+        """
+        Args:
+            enabled: Whether stages are timed
+        """
+        self.enabled = enabled
+        self.stages = {stage: Histogram(STAGE_LATENCY_BUCKETS) for stage in PIPELINE_STAGES}
+        self.faces_per_frame = Histogram(FACES_PER_FRAME_BUCKETS)
+        self.frames = 0
+        self._pending = {stage: 0.0 for stage in PIPELINE_STAGES}
+        self._nested: List[float] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time a block of work as pipeline stage `name`
+
+        Args:
+            name: One of PIPELINE_STAGES
+        """
+        if not self.enabled:
+            yield
+            return
+
+        started = time.perf_counter()
+        self._nested.append(0.0)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._pending[name] += elapsed - self._nested.pop()
+            if self._nested:
+                self._nested[-1] += elapsed
+
+    def finish_frames(self, faces_per_frame: Sequence[int]) -> None:
+        """
+        Record the accumulated stage times for a group of frames
+
+        Args:
+            faces_per_frame: Number of faces found in each frame of the group
+        """
+        if not self.enabled or not faces_per_frame:
+            return
+
+        frame_count = len(faces_per_frame)
+        for stage, seconds in self._pending.items():
+            if seconds:
+                self.stages[stage].observe(seconds / frame_count, frame_count)
+                self._pending[stage] = 0.0
+
+        for face_count in faces_per_frame:
+            self.faces_per_frame.observe(face_count)
+        self.frames += frame_count
+
+    def drain(self) -> Optional[Dict[str, Any]]:
+        """
+        Take the observations made since the last drain
+
+        Returns:
+            Picklable raw histogram state for PipelineMetrics.merge(),
+            or None if nothing was observed
+        """
+        if not self.frames:
+            return None
+
+        drained = {
+            'stages': {
+                stage: (histogram.counts, histogram.sum)
+                for stage, histogram in self.stages.items() if histogram.count
+            },
+            'faces_per_frame': (self.faces_per_frame.counts, self.faces_per_frame.sum),
+            'frames': self.frames,
+        }
+
+        for histogram in self.stages.values():
+            histogram.reset()
+        self.faces_per_frame.reset()
+        self.frames = 0
+
+        return drained
+
+
+class PipelineMetrics:
+    """
+    Stage latency metrics merged from all emotion workers.
+
+    Lives in the API process; workers return their drained StageTimer
+    state with each result. Timing can be switched on and off at runtime
+    through `enabled`, which is sent to the workers with every call.
+    """
+
+    def __init__(self, enabled: bool = True, rate_window_seconds: float = 60.0):
+        """
+        Args:
+            enabled: Whether workers time their pipeline stages
+            rate_window_seconds: Window for the frames/sec gauge
+        """
+        self.enabled = enabled
+        self.rate_window_seconds = rate_window_seconds
+        self.stages = {stage: Histogram(STAGE_LATENCY_BUCKETS) for stage in PIPELINE_STAGES}
+        self.faces_per_frame = Histogram(FACES_PER_FRAME_BUCKETS)
+        self.frames = 0
+        self._recent = deque()  # (monotonic time, frames) per merged batch
+
+    def merge(self, drained: Optional[Dict[str, Any]]) -> None:
+        """
+        Add the observations drained from a worker's StageTimer
+
+        Args:
+            drained: Result of StageTimer.drain() (None is ignored)
+        """
+        if not drained:
+            return
+
+        for stage, (counts, total) in drained['stages'].items():
+            self.stages[stage].merge(counts, total)
+        self.faces_per_frame.merge(*drained['faces_per_frame'])
+        self.frames += drained['frames']
+        self._recent.append((time.monotonic(), drained['frames']))
+
+    def frames_per_second(self) -> float:
+        """Frames analyzed per second over the rate window"""
+        cutoff = time.monotonic() - self.rate_window_seconds
+        while self._recent and self._recent[0][0] < cutoff:
+            self._recent.popleft()
+
+        return sum(frames for _, frames in self._recent) / self.rate_window_seconds
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get stage quantiles as a dictionary
+
+        Returns:
+            Dictionary with p50/p95/p99 per stage in milliseconds, frames/sec and faces/frame
+        """
+        return {
+            'enabled': self.enabled,
+            'frames': self.frames,
+            'frames_per_second': round(self.frames_per_second(), 2),
+            'faces_per_frame': self.faces_per_frame.snapshot()['mean'],
+            'stages_ms': {
+                stage: {
+                    f'p{int(q * 100)}': round(histogram.quantile(q) * 1000, 3)
+                    for q in STAGE_QUANTILES
+                }
+                for stage, histogram in self.stages.items()
+            },
+        }
+
+    def render_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format (0.0.4)
+
+        Returns:
+            Metrics text
+        """
+        lines = [
+            '# HELP emotion_stage_timing_enabled Whether pipeline stage timing is on',
+            '# TYPE emotion_stage_timing_enabled gauge',
+            f'emotion_stage_timing_enabled {int(self.enabled)}',
+            '# HELP emotion_stage_latency_seconds Per-frame time spent in each emotion pipeline stage',
+            '# TYPE emotion_stage_latency_seconds histogram',
+        ]
+
+        for stage, histogram in self.stages.items():
+            lines.extend(_histogram_lines('emotion_stage_latency_seconds', histogram, f'stage="{stage}"'))
+
+        lines += [
+            '# HELP emotion_stage_latency_quantile_seconds Estimated per-frame stage latency quantiles',
+            '# TYPE emotion_stage_latency_quantile_seconds gauge',
+        ]
+        for stage, histogram in self.stages.items():
+            for q in STAGE_QUANTILES:
+                lines.append(
+                    f'emotion_stage_latency_quantile_seconds{{stage="{stage}",quantile="{q}"}} '
+                    f'{histogram.quantile(q):.6g}'
+                )
+
+        lines += [
+            '# HELP emotion_faces_per_frame Faces found per analyzed frame',
+            '# TYPE emotion_faces_per_frame histogram',
+            *_histogram_lines('emotion_faces_per_frame', self.faces_per_frame),
+            '# HELP emotion_frames_total Frames analyzed with stage timing on',
+            '# TYPE emotion_frames_total counter',
+            f'emotion_frames_total {self.frames}',
+            f'# HELP emotion_frames_per_second Frames analyzed per second over the last {self.rate_window_seconds:g}s',
+            '# TYPE emotion_frames_per_second gauge',
+            f'emotion_frames_per_second {self.frames_per_second():.6g}',
+        ]
+
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: str = '') -> List[str]:
+    """Prometheus bucket, sum and count lines for one histogram"""
+    prefix = f'{labels},' if labels else ''
+    suffix = f'{{{labels}}}' if labels else ''
+    lines = []
+    cumulative = 0
+
+    for bound, bucket_count in zip(histogram.buckets, histogram.counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound:g}"}} {cumulative}')
+
+    lines += [
+        f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}',
+        f'{name}_sum{suffix} {histogram.sum:.6g}',
+        f'{name}_count{suffix} {histogram.count}',
+    ]
+
+    return lines
@@ -0,0 +1,473 @@
+"""
+Emotion Model Server
+Optional standalone inference process shared by every API worker on a node
+
+Under gunicorn with N uvicorn workers, each worker would otherwise start its
+own EmotionExecutor pool and load N times as many models, each batching only
+its own traffic. With EMOTION_SERVER_SOCKET set, API workers instead hand
+frames to one model server over a Unix socket, and the server's micro-batcher
+batches frames from all of them together.
+
+Usage (from backend/, with the same .env as the API):
+    python -m emotion_detection.model_server --socket /run/emotion/model.sock
+
+Wire format: each message is a pickle (protocol 5) with encoded images sent
+as out-of-band buffers, so frame bytes are written to and read from the
+socket directly instead of being copied into the pickle stream. The socket
+is created with mode 0600 - only processes of the same user can connect.
+"""
+
+import argparse
+import asyncio
+import os
+import pickle
+import struct
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from .batcher import MicroBatcher
+from .executor import EmotionExecutor
+from .runtime import describe_worker_threads
+from .tracking import FaceTrack
+
+# Message header: part count, then one length per part
+_COUNT = struct.Struct('!I')
+_LENGTH = struct.Struct('!Q')
+
+
+# ============================================================================
+# Wire format
+# ============================================================================
+
+def _out_of_band(image: Union[str, bytes]) -> Union[str, pickle.PickleBuffer]:
+    """Mark raw image bytes to travel as an out-of-band buffer"""
+    return pickle.PickleBuffer(image) if isinstance(image, (bytes, bytearray)) else image
+
+
+def write_message(writer: asyncio.StreamWriter, message: Any) -> None:
+    """
+    Write one message to a stream (call drain() afterwards)
+
+    Args:
+        writer: Stream to write to
+        message: Picklable message; PickleBuffer values are sent out of band
+    """
+    buffers: List[pickle.PickleBuffer] = []
+    body = pickle.dumps(message, protocol=5, buffer_callback=buffers.append)
+    parts = [memoryview(body)] + [buffer.raw() for buffer in buffers]
+
+    header = _COUNT.pack(len(parts)) + b''.join(_LENGTH.pack(part.nbytes) for part in parts)
+    writer.writelines([header, *parts])
+
+
+async def read_message(reader: asyncio.StreamReader) -> Any:
+    """
+    Read one message from a stream
+
+    Args:
+        reader: Stream to read from
+
+    Returns:
+        Unpickled message (out-of-band buffers arrive as bytes)
+
+    Raises:
+        asyncio.IncompleteReadError: If the peer closed the connection
+    """
+    count, = _COUNT.unpack(await reader.readexactly(_COUNT.size))
+    lengths = struct.unpack(f'!{count}Q', await reader.readexactly(_LENGTH.size * count))
+    parts = [await reader.readexactly(length) for length in lengths]
+
+    return pickle.loads(parts[0], buffers=parts[1:])
+
+
+def local_status(executor: EmotionExecutor, batcher: MicroBatcher) -> Dict[str, Any]:
+    """
+    Collect the status of an in-process executor and batcher
+
+    Args:
+        executor: Emotion executor
+        batcher: Micro-batcher in front of the executor
+
+    Returns:
+        Dictionary with running state, model info, load, batching and stage statistics
+    """
+    return {
+        "running": executor.running,
+        "model": executor.model_info(),
+        "executor": executor.stats(),
+        "batching": batcher.stats(),
+        "stages": executor.metrics.summary(),
+    }
+
+
+# ============================================================================
+# Server process side
+# ============================================================================
+
+class EmotionModelServer:
+    """
+    Serves an EmotionExecutor and its MicroBatcher over a Unix socket.
+
+    Each connection (one per API worker) may have many requests in flight;
+    responses carry the request id and are written as soon as they are ready.
+    """
+
+    def __init__(self, executor: EmotionExecutor, batcher: MicroBatcher, socket_path: str):
+        """
+        Args:
+            executor: Emotion executor holding the models
+            batcher: Micro-batcher in front of the executor
+            socket_path: Unix socket path to listen on
+        """
+        self.executor = executor
+        self.batcher = batcher
+        self.socket_path = socket_path
+        self.connections = 0
+
+    async def serve(self) -> None:
+        """Warm up the models, then serve until cancelled"""
+        for info in await self.executor.warm_up():
+            print(
+                f"Emotion worker {info['pid']} ready: model {info['model_version']}, "
+                f"{describe_worker_threads(info)}"
+            )
+
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+        # Requests are pickles, so the socket is owner-only from the moment
+        # it is bound (a chmod afterwards would leave a window open)
+        previous_umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self._handle_connection, path=self.socket_path)
+        finally:
+            os.umask(previous_umask)
+        print(f"Emotion model server listening on {self.socket_path}")
+
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read requests from one API worker and answer each as it completes"""
+        self.connections += 1
+        write_lock = asyncio.Lock()
+        tasks: Set[asyncio.Task] = set()
+
+        try:
+            while True:
+                request_id, operation, args = await read_message(reader)
+
+                task = asyncio.ensure_future(
+                    self._handle_request(writer, write_lock, request_id, operation, args)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _handle_request(
+        self,
+        writer: asyncio.StreamWriter,
+        write_lock: asyncio.Lock,
+        request_id: int,
+        operation: str,
+        args: tuple
+    ) -> None:
+        """Run one request and write its (request_id, ok, result or error, model version) response"""
+        try:
+            response = (request_id, True, await self.dispatch(operation, args))
+        except Exception as e:
+            # Exceptions of the worker's libraries may not unpickle in the API process
+            response = (request_id, False, RuntimeError(f"{type(e).__name__}: {e}"))
+        # Every reply carries the model version, so clients keying caches on
+        # it see a warm-up or model swap without polling status()
+        response += (self.executor.model_version,)
+
+        if writer.is_closing():
+            return
+
+        async with write_lock:
+            write_message(writer, response)
+            await writer.drain()
+
+    async def dispatch(self, operation: str, args: tuple) -> Any:
+        """
+        Run a client operation
+
+        Args:
+            operation: 'submit', 'run', 'status' or 'prometheus'
+            args: Operation arguments
+
+        Returns:
+            Operation result
+        """
+        if operation == 'submit':
+            image, track, detector = args
+            return await self.batcher.submit_tracked(image, track, detector)
+
+        if operation == 'run':
+            method, method_args = args
+            return await self.executor.run(method, *method_args)
+
+        if operation == 'status':
+            status = local_status(self.executor, self.batcher)
+            status["connections"] = self.connections
+            return status
+
+        if operation == 'prometheus':
+            return self.executor.metrics.render_prometheus()
+
+        raise ValueError(f"Unknown operation '{operation}'")
+
+
+# ============================================================================
+# API process side
+# ============================================================================
+
+class EmotionModelClient:
+    """
+    Connection from an API worker to the emotion model server.
+
+    Offers the parts of the EmotionExecutor and MicroBatcher interfaces the
+    routes use (run, warm_up, shutdown, submit, submit_tracked), so routes
+    work the same against a local pool or the shared server. Requests are
+    multiplexed over one connection per API worker.
+    """
+
+    def __init__(self, socket_path: str, connect_timeout: float = 60.0):
+        """
+        Args:
+            socket_path: Unix socket of the model server
+            connect_timeout: How long to wait for the server to come up
+        """
+        self.socket_path = socket_path
+        self.connect_timeout = connect_timeout
+
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._write_lock: Optional[asyncio.Lock] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self.model_version: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the client is connected to the server"""
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self) -> None:
+        """Connect to the server, retrying until connect_timeout (no-op if connected)"""
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+            self._write_lock = asyncio.Lock()
+
+        async with self._connect_lock:
+            if self.running:
+                return
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.connect_timeout
+
+            while True:
+                try:
+                    self._reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+                    break
+                except (FileNotFoundError, ConnectionError):
+                    if loop.time() >= deadline:
+                        raise ConnectionError(f"Emotion model server not reachable at {self.socket_path}")
+                    await asyncio.sleep(0.5)
+
+            self._reader_task = asyncio.ensure_future(self._read_responses(self._reader))
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        """Resolve pending requests as responses arrive, tracking the server's model version"""
+        try:
+            while True:
+                request_id, ok, payload, self.model_version = await read_message(reader)
+
+                future = self._pending.get(request_id)
+                if future is None or future.done():
+                    continue
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # Fail everything still waiting; the next request reconnects
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Lost connection to emotion model server"))
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    async def _call(self, operation: str, *args) -> Any:
+        """Send one request and wait for its response"""
+        await self.connect()
+        loop = asyncio.get_running_loop()
+
+        request_id = self._next_id
+        self._next_id += 1
+        future = loop.create_future()
+        self._pending[request_id] = future
+
+        try:
+            async with self._write_lock:
+                write_message(self._writer, (request_id, operation, args))
+                await self._writer.drain()
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def warm_up(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Wait for the server and report its workers
+
+        Args:
+            timeout: Maximum time to wait for the server (default connect_timeout)
+
+        Returns:
+            Model info of the server's workers
+        """
+        if timeout is not None:
+            self.connect_timeout = timeout
+
+        status = await self.status()
+        return status["model"]["workers"]
+
+    def shutdown(self) -> None:
+        """Close the connection (the server keeps running)"""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def run(self, method: str, *args) -> Any:
+        """
+        Run an EmotionDetector method in one of the server's workers
+
+        Args:
+            method: EmotionDetector method name (e.g. 'analyze_base64_images')
+            *args: Positional arguments for the method
+
+        Returns:
+            Method result
+        """
+        return await self._call('run', method, args)
+
+    async def submit(self, image: Union[str, bytes], detector: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Queue a frame in the server's micro-batcher
+
+        Args:
+            image: Base64 encoded image string or raw encoded image bytes
+            detector: Face detector backend name (None for the server default)
+
+        Returns:
+            List of emotion analysis results for the frame
+        """
+        faces, _ = await self.submit_tracked(image, None, detector)
+        return faces
+
+    async def submit_tracked(
+        self,
+        image: Union[str, bytes],
+        track: Optional[FaceTrack],
+        detector: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[FaceTrack]]:
+        """
+        Queue a live session frame in the server's micro-batcher
+
+        Args:
+            image: Base64 encoded image string or raw encoded image bytes
+            track: Session face tracking state (None for full detection)
+            detector: Face detector backend name (None for the server default)
+
+        Returns:
+            Tuple of (emotion analysis results, updated tracking state)
+        """
+        return await self._call('submit', _out_of_band(image), track, detector)
+
+    async def status(self) -> Dict[str, Any]:
+        """
+        Get the server status
+
+        Returns:
+            Dictionary in the local_status format, plus open connections
+        """
+        return await self._call('status')
+
+    async def render_prometheus(self) -> str:
+        """
+        Get the server's pipeline metrics
+
+        Returns:
+            Prometheus text format
+        """
+        return await self._call('prometheus')
+
+
+# Singleton instance
+_model_client: Optional[EmotionModelClient] = None
+
+
+def get_model_client(socket_path: str, connect_timeout: float = 60.0) -> EmotionModelClient:
+    """
+    Get singleton instance of the model server client
+
+    Args:
+        socket_path: Unix socket of the model server (only used on first call)
+        connect_timeout: Server start-up wait (only used on first call)
+
+    Returns:
+        EmotionModelClient instance
+    """
+    global _model_client
+
+    if _model_client is None:
+        _model_client = EmotionModelClient(socket_path, connect_timeout)
+
+    return _model_client
+
+
+def main(argv: Sequence[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Shared emotion model server")
+    parser.add_argument("--socket", help="Unix socket path (default: EMOTION_SERVER_SOCKET)")
+    args = parser.parse_args(argv)
+
+    # Built from the API settings so the server matches what workers would run locally
+    from app.config import settings
+    from app.routes.emotion import get_local_batcher, get_local_executor
+
+    socket_path = args.socket or settings.EMOTION_SERVER_SOCKET
+    if not socket_path:
+        parser.error("--socket or EMOTION_SERVER_SOCKET is required")
+
+    executor = get_local_executor()
+    server = EmotionModelServer(executor, get_local_batcher(), socket_path)
+
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+"""
+Emotion Result Cache
+Exact-match cache of analysis results keyed by image content, so retried
+and re-proxied requests with byte-identical frames skip the model
+"""
+
+import base64
+import binascii
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+# Rough memory footprint of a cached result, for the memory cap
+ENTRY_OVERHEAD_BYTES = 256
+FACE_RESULT_BYTES = 1024
+
+
+def content_key(image: Union[str, bytes], *context: Optional[str]) -> bytes:
+    """
+    Hash an image by its encoded bytes
+
+    A base64 string and the raw bytes of the same image get the same key.
+
+    Args:
+        image: Base64 encoded image string (data URL prefix allowed) or raw image bytes
+        *context: Anything else the result depends on (model version, face detector)
+
+    Returns:
+        16-byte BLAKE2b digest
+    """
+    if isinstance(image, str):
+        try:
+            image = base64.b64decode(image.split(',')[-1])
+        except (binascii.Error, ValueError):
+            # Not valid base64 - analysis will fail, but the key must not
+            image = image.encode()
+
+    digest = hashlib.blake2b(image, digest_size=16)
+    for value in context:
+        digest.update(b'\0' + str(value).encode())
+
+    return digest.digest()
+
+
+def content_keys(images: Sequence[Union[str, bytes]], *context: Optional[str]) -> List[bytes]:
+    """
+    Hash several images (see content_key)
+
+    Blocking; a batch of frames is hashed in one thread pool call rather
+    than on the event loop.
+
+    Args:
+        images: Base64 encoded image strings or raw image bytes
+        *context: Anything else the results depend on
+
+    Returns:
+        One key per image
+    """
+    return [content_key(image, *context) for image in images]
+
+
+def _result_size(faces: List[Dict[str, Any]]) -> int:
+    """Estimated memory held by one cached result"""
+    return ENTRY_OVERHEAD_BYTES + FACE_RESULT_BYTES * len(faces)
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of face results by content key.
+
+    Entries expire after `ttl_seconds`; the least recently used entries are
+    evicted beyond `max_entries` or an estimated `max_bytes`.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 16 * 1024 * 1024, ttl_seconds: float = 300.0):
+        """
+        Args:
+            max_entries: Maximum number of cached results (0 disables the cache)
+            max_bytes: Estimated memory cap for cached results
+            ttl_seconds: Maximum age of a cached result
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether results are cached at all"""
+        return self.max_entries > 0
+
+    def get(self, key: bytes) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up the result of an identical image
+
+        Args:
+            key: Content key (see content_key)
+
+        Returns:
+            Cached face results, or None on a miss
+        """
+        entry = self._entries.get(key)
+
+        if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+            self._remove(key)
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: bytes, faces: List[Dict[str, Any]]) -> None:
+        """
+        Cache the analysis result of an image
+
+        Args:
+            key: Content key (see content_key)
+            faces: Face results for the image
+        """
+        if not self.enabled:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        size = _result_size(faces)
+        self._entries[key] = (time.monotonic(), faces, size)
+        self.bytes += size
+
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(self, key: bytes) -> None:
+        """Drop one entry"""
+        _, _, size = self._entries.pop(key)
+        self.bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics
+
+        Returns:
+            Dictionary with hits, misses, hit rate, evictions, expirations and size
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'size': len(self._entries),
+            'estimated_bytes': self.bytes,
+        }
+
+    def render_prometheus(self) -> str:
+        """
+        Render cache counters in the Prometheus text exposition format
+
+        Returns:
+            Metrics text
+        """
+        return '\n'.join([
+            '# HELP emotion_result_cache_lookups_total Result cache lookups by outcome',
+            '# TYPE emotion_result_cache_lookups_total counter',
+            f'emotion_result_cache_lookups_total{{result="hit"}} {self.hits}',
+            f'emotion_result_cache_lookups_total{{result="miss"}} {self.misses}',
+            '# HELP emotion_result_cache_evictions_total Result cache entries dropped by reason',
+            '# TYPE emotion_result_cache_evictions_total counter',
+            f'emotion_result_cache_evictions_total{{reason="capacity"}} {self.evictions}',
+            f'emotion_result_cache_evictions_total{{reason="ttl"}} {self.expirations}',
+            '# HELP emotion_result_cache_entries Cached results',
+            '# TYPE emotion_result_cache_entries gauge',
+            f'emotion_result_cache_entries {len(self._entries)}',
+        ]) + '\n'
+
+
+# Singleton instance
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache(
+    max_entries: int = 1024,
+    max_bytes: int = 16 * 1024 * 1024,
+    ttl_seconds: float = 300.0
+) -> ResultCache:
+    """
+    Get singleton instance of the result cache
+
+    Args:
+        max_entries: Maximum number of cached results (only used on first call)
+        max_bytes: Estimated memory cap (only used on first call)
+        ttl_seconds: Maximum age of a cached result (only used on first call)
+
+    Returns:
+        ResultCache instance
+    """
+    global _result_cache
+
+    if _result_cache is None:
+        _result_cache = ResultCache(max_entries, max_bytes, ttl_seconds)
+
+    return _result_cache
@@ -0,0 +1,256 @@
+"""
+Emotion Model Runtimes
+Pluggable inference backends for the emotion CNN, all exposing a
+Keras-compatible predict()
+
+Backends:
+    - keras:  full TensorFlow/Keras model (also the training fallback)
+    - tflite: frozen .tflite artifact (float32 or int8 quantized) run by the
+              lightweight TFLite interpreter. Uses the standalone
+              `tflite-runtime` package when installed, so the worker never
+              imports TensorFlow.
+
+Thread pool sizing and CPU pinning for worker processes live here too, as
+both have to be applied before a runtime creates its threads.
+"""
+
+import os
+
+import numpy as np
+from typing import Dict, List, Optional
+
+
+INFERENCE_BACKENDS = ('auto', 'keras', 'tflite')
+
+
+def resolve_inference_backend(model_path: Optional[str], backend: str = 'auto') -> str:
+    """
+    Pick the inference backend for a model file
+
+    Args:
+        model_path: Model file path (None for an untrained model)
+        backend: Requested backend ('auto' chooses by file extension)
+
+    Returns:
+        'keras' or 'tflite'
+    """
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}'. Choose from: {', '.join(INFERENCE_BACKENDS)}")
+
+    is_tflite = bool(model_path) and model_path.endswith('.tflite')
+
+    if backend == 'auto':
+        return 'tflite' if is_tflite else 'keras'
+
+    if backend == 'tflite' and not is_tflite:
+        raise ValueError(
+            "The tflite backend needs an exported .tflite model "
+            "(python -m emotion_detection.export_model)"
+        )
+
+    if backend == 'keras' and is_tflite:
+        raise ValueError("The keras backend needs Keras weights (.h5), not a .tflite model")
+
+    return backend
+
+
+def usable_cpus() -> List[int]:
+    """
+    CPUs this process may run on
+
+    Returns:
+        Sorted CPU ids (the affinity mask where the OS exposes one)
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def worker_cpu_sets(cpus: List[int], workers: int) -> List[List[int]]:
+    """
+    Split CPUs into one contiguous share per worker
+
+    With fewer CPUs than workers, workers share single CPUs round-robin.
+
+    Args:
+        cpus: CPUs available to the workers
+        workers: Number of worker processes
+
+    Returns:
+        One CPU list per worker
+    """
+    workers = max(1, workers)
+    if len(cpus) < workers:
+        return [[cpus[index % len(cpus)]] for index in range(workers)]
+
+    share, extra = divmod(len(cpus), workers)
+    sets, start = [], 0
+    for index in range(workers):
+        end = start + share + (1 if index < extra else 0)
+        sets.append(cpus[start:end])
+        start = end
+
+    return sets
+
+
+def pin_to_cpus(cpus: List[int]) -> List[int]:
+    """
+    Restrict the current process to some CPUs
+
+    Args:
+        cpus: CPU ids to run on
+
+    Returns:
+        The effective CPUs (unchanged where the OS has no affinity API)
+    """
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        # Threads already started (e.g. by the BLAS numpy links) are moved too
+        threads = os.listdir('/proc/self/task') if os.path.isdir('/proc/self/task') else ['0']
+        for thread_id in threads:
+            os.sched_setaffinity(int(thread_id), cpus)
+    elif cpus:
+        print("Warning: CPU pinning is not supported on this platform")
+
+    return usable_cpus()
+
+
+def configure_tensorflow_threads(intra_op_threads: int = 0, inter_op_threads: int = 0) -> Dict[str, int]:
+    """
+    Size TensorFlow's thread pools
+
+    Must run before TensorFlow executes its first op in the process;
+    later calls keep the pools TensorFlow already created.
+
+    Args:
+        intra_op_threads: Threads used inside one op (0 = TensorFlow default)
+        inter_op_threads: Ops run in parallel (0 = TensorFlow default)
+
+    Returns:
+        Effective {'intra_op': n, 'inter_op': n} (0 = TensorFlow default)
+    """
+    import tensorflow as tf
+
+    try:
+        if intra_op_threads:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        if inter_op_threads:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    except RuntimeError as e:
+        print(f"Warning: TensorFlow threads already configured: {e}")
+
+    return {
+        'intra_op': tf.config.threading.get_intra_op_parallelism_threads(),
+        'inter_op': tf.config.threading.get_inter_op_parallelism_threads(),
+    }
+
+
+def describe_worker_threads(info: Dict) -> str:
+    """
+    Summarize a worker's effective threading for startup logs
+
+    Args:
+        info: EmotionDetector.model_info() of the worker
+
+    Returns:
+        e.g. "threads intra-op 2 / inter-op default / opencv 2, cpus 0-1"
+    """
+    threads = info['threads']
+
+    # Collapse consecutive CPU ids into ranges
+    ranges: List[List[int]] = []
+    for cpu in info['cpus']:
+        if ranges and cpu == ranges[-1][1] + 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+    cpus = ",".join(f"{first}-{last}" if last > first else str(first) for first, last in ranges)
+
+    return (
+        f"threads intra-op {threads['intra_op'] or 'default'} / "
+        f"inter-op {threads['inter_op'] or 'default'} / opencv {threads['opencv']}, "
+        f"cpus {cpus}"
+    )
+
+
+def _load_interpreter(model_path: str, num_threads: int = 0):
+    """
+    Create a TFLite interpreter without default delegates
+
+    Prefers the standalone tflite-runtime package and falls back to the
+    interpreter bundled with TensorFlow.
+
+    Args:
+        model_path: Path to a .tflite file
+        num_threads: Kernel threads (0 = interpreter default)
+
+    Returns:
+        Interpreter instance
+    """
+    try:
+        from tflite_runtime.interpreter import Interpreter, OpResolverType
+    except ImportError:
+        import tensorflow as tf
+        Interpreter = tf.lite.Interpreter
+        OpResolverType = tf.lite.experimental.OpResolverType
+
+    return Interpreter(
+        model_path=model_path,
+        experimental_op_resolver_type=OpResolverType.BUILTIN_WITHOUT_DEFAULT_DELEGATES,
+        num_threads=num_threads or None
+    )
+
+
+class TFLiteModel:
+    """
+    Frozen emotion CNN loaded from a TFLite flatbuffer.
+
+    The interpreter memory-maps the model file and the builtin kernels
+    read weights straight from the mapping, so every worker process
+    loading the same file shares the same physical pages. Default
+    delegates (XNNPACK) are disabled because they repack the weights into
+    private per-process buffers.
+    """
+
+    def __init__(self, model_path: str, num_threads: int = 0):
+        """
+        Args:
+            model_path: Path to a .tflite file produced by export_model
+            num_threads: Kernel threads (0 = interpreter default)
+        """
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.interpreter = _load_interpreter(model_path, num_threads)
+
+        input_details = self.interpreter.get_input_details()[0]
+        self._input_index = input_details['index']
+        self._output_index = self.interpreter.get_output_details()[0]['index']
+        self._batch_size = None
+
+        # int8 models quantize inside the graph but keep float32 I/O
+        self.quantized = any(
+            tensor['dtype'] == np.int8 for tensor in self.interpreter.get_tensor_details()
+        )
+
+    def predict(self, batch: np.ndarray, verbose: int = 0) -> np.ndarray:
+        """
+        Run inference on a batch of preprocessed faces
+
+        Args:
+            batch: Input tensor of shape (N, 48, 48, 1)
+            verbose: Ignored (Keras compatibility)
+
+        Returns:
+            Softmax probabilities of shape (N, 7)
+        """
+        batch = np.ascontiguousarray(batch, dtype=np.float32)
+
+        # Tensors are re-allocated only when the batch size changes
+        if batch.shape[0] != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input_index, list(batch.shape))
+            self.interpreter.allocate_tensors()
+            self._batch_size = batch.shape[0]
+
+        self.interpreter.set_tensor(self._input_index, batch)
+        self.interpreter.invoke()
+
+        return self.interpreter.get_tensor(self._output_index)
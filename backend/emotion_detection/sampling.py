@@ -0,0 +1,194 @@
+"""
+Adaptive Frame Sampling
+Scene-change driven sampler that analyzes frames often while the face region
+changes and drops to a floor rate while the scene is static
+"""
+
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+# Width (pixels) of the grayscale thumbnails frames are compared at
+THUMBNAIL_WIDTH = 64
+
+
+def make_thumbnail(frame: np.ndarray) -> np.ndarray:
+    """
+    Shrink a frame to a small grayscale thumbnail for difference scoring
+
+    Args:
+        frame: BGR or grayscale image
+
+    Returns:
+        Grayscale thumbnail THUMBNAIL_WIDTH pixels wide (int16, ready for subtraction)
+    """
+    # Imported here: API workers load this module before any frame arrives
+    import cv2
+
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    height, width = gray.shape
+    size = (THUMBNAIL_WIDTH, max(1, round(height * THUMBNAIL_WIDTH / width)))
+
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+class AdaptiveSampler:
+    """
+    Decides which frames of a stream are worth analyzing.
+
+    Each frame's thumbnail is compared with the thumbnail of the last
+    analyzed frame. The score is the mean absolute difference (0-255) over
+    the whole thumbnail or, if larger, over the tracked face region, so a
+    changing expression is not diluted by a static background. A frame is
+    analyzed when the score reaches `change_threshold` (at most `max_rate`
+    times per second) and at least `min_rate` times per second regardless.
+    """
+
+    def __init__(self, min_rate: float = 0.5, max_rate: float = 5.0, change_threshold: float = 8.0):
+        """
+        Args:
+            min_rate: Floor analysis rate (frames per second) for static scenes
+            max_rate: Maximum analysis rate while the scene changes
+            change_threshold: Difference score that counts as a scene change
+        """
+        self.min_interval = 1.0 / min_rate if min_rate > 0 else float('inf')
+        self.max_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.change_threshold = change_threshold
+
+        # Face box as (top, right, bottom, left) fractions of the frame size
+        self.face_box: Optional[tuple] = None
+        self._reference: Optional[np.ndarray] = None
+        self._last_analyzed_at: Optional[float] = None
+
+        self.frames = 0
+        self.analyzed_on_change = 0
+        self.analyzed_on_floor = 0
+        self.skipped = 0
+        self.last_score = 0.0
+
+    def track_face(self, location: Optional[Dict[str, int]], frame_width: int, frame_height: int) -> None:
+        """
+        Set the face region that is scored separately
+
+        Args:
+            location: Face location dict (top, right, bottom, left) or None
+            frame_width: Width of the frame the location refers to
+            frame_height: Height of the frame the location refers to
+        """
+        if location is None or not frame_width or not frame_height:
+            self.face_box = None
+            return
+
+        self.face_box = (
+            location['top'] / frame_height,
+            location['right'] / frame_width,
+            location['bottom'] / frame_height,
+            location['left'] / frame_width,
+        )
+
+    def should_analyze(self, thumbnail: np.ndarray, timestamp: float) -> bool:
+        """
+        Decide whether a frame should be analyzed, and if so make it the reference
+
+        Args:
+            thumbnail: Thumbnail of the frame (see make_thumbnail)
+            timestamp: Frame time in seconds (monotonic within the stream)
+
+        Returns:
+            True if the frame should be analyzed, False to reuse the last result
+        """
+        reason = self.check(thumbnail, timestamp)
+        if reason is None:
+            self.skip()
+            return False
+
+        self.accept(thumbnail, timestamp, reason)
+        return True
+
+    def check(self, thumbnail: np.ndarray, timestamp: float) -> Optional[str]:
+        """
+        Decide whether a frame should be analyzed without changing the reference
+
+        Callers that may still drop the frame afterwards (e.g. admission
+        control) call accept() once it was actually analyzed, so a dropped
+        frame never becomes the reference later frames are compared with,
+        and skip() only when the last result was actually reused.
+
+        Args:
+            thumbnail: Thumbnail of the frame (see make_thumbnail)
+            timestamp: Frame time in seconds (monotonic within the stream)
+
+        Returns:
+            'change' or 'floor' if the frame should be analyzed, None to reuse the last result
+        """
+        self.frames += 1
+
+        if self._reference is None or self._reference.shape != thumbnail.shape:
+            return 'change'
+
+        elapsed = timestamp - self._last_analyzed_at
+        self.last_score = self._score(thumbnail)
+
+        if elapsed >= self.min_interval:
+            return 'floor'
+
+        if elapsed >= self.max_interval and self.last_score >= self.change_threshold:
+            return 'change'
+
+        return None
+
+    def skip(self) -> None:
+        """Count a frame whose analysis was saved by reusing the last result"""
+        self.skipped += 1
+
+    def _score(self, thumbnail: np.ndarray) -> float:
+        """Mean absolute difference to the reference, whole frame or face region"""
+        difference = np.abs(thumbnail - self._reference)
+        score = float(difference.mean())
+
+        if self.face_box is not None:
+            height, width = difference.shape
+            top, right, bottom, left = self.face_box
+            region = difference[
+                max(0, int(top * height)):max(1, int(np.ceil(bottom * height))),
+                max(0, int(left * width)):max(1, int(np.ceil(right * width)))
+            ]
+            if region.size:
+                score = max(score, float(region.mean()))
+
+        return score
+
+    def accept(self, thumbnail: np.ndarray, timestamp: float, reason: str) -> None:
+        """
+        Make an analyzed frame the new reference and count the decision
+
+        Args:
+            thumbnail: Thumbnail of the frame (see make_thumbnail)
+            timestamp: Frame time in seconds
+            reason: Decision returned by check()
+        """
+        self._reference = thumbnail
+        self._last_analyzed_at = timestamp
+
+        if reason == 'change':
+            self.analyzed_on_change += 1
+        else:
+            self.analyzed_on_floor += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get sampling statistics
+
+        Returns:
+            Dictionary with frames seen, analysis decisions and the fraction
+            of frames whose analysis was saved
+        """
+        return {
+            'frames': self.frames,
+            'analyzed_on_change': self.analyzed_on_change,
+            'analyzed_on_floor': self.analyzed_on_floor,
+            'skipped': self.skipped,
+            'saved_fraction': self.skipped / self.frames if self.frames else 0.0,
+            'last_score': round(self.last_score, 2),
+        }
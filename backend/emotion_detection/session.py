@@ -0,0 +1,341 @@
+"""
+Emotion Session State
+Per-interview state for live emotion analysis (running aggregates per
+interview and question, last face box), shared by the HTTP and streaming paths
+"""
+
+import time
+from typing import Any, Dict, List, Optional
+
+from .admission import FrameSlot
+from .aggregation import EmotionAggregator
+from .dedup import FrameCache
+from .labels import SENTIMENT_MAPPING
+from .sampling import AdaptiveSampler
+from .tracking import FaceTrack
+
+
+class EmotionSession:
+    """
+    Running emotion state for one live interview.
+
+    Updating is O(1) per frame, so a long streaming session never has to
+    keep or re-scan its frame history.
+    """
+
+    def __init__(
+        self,
+        interview_id: int,
+        redetect_interval: int = 5,
+        frame_cache: Optional[FrameCache] = None,
+        ema_alpha: float = 0.1,
+        sampler: Optional[AdaptiveSampler] = None
+    ):
+        """
+        Args:
+            interview_id: Interview the session belongs to
+            redetect_interval: Full face detection every N frames (1 disables tracking)
+            frame_cache: Near-duplicate frame cache (None disables deduplication)
+            ema_alpha: Weight of the newest frame in the sentiment EMA
+            sampler: Adaptive frame sampler (None analyzes every frame)
+        """
+        self.interview_id = interview_id
+        self.started_at = time.time()
+        self.last_seen = self.started_at
+
+        self.frames = 0
+        self.ema_alpha = ema_alpha
+        self.aggregator = EmotionAggregator(ema_alpha)
+        self.questions: Dict[int, EmotionAggregator] = {}
+        self.question_id: Optional[int] = None
+        self.last_face: Optional[Dict[str, int]] = None
+        self.last_faces: Optional[List[Dict[str, Any]]] = None
+
+        # Face tracking state, sent to the worker with each frame
+        self.face_track: Optional[FaceTrack] = (
+            FaceTrack(redetect_interval) if redetect_interval > 1 else None
+        )
+        self.frame_cache = frame_cache
+        self.sampler = sampler
+
+        # Admission state: one frame analyzing, only the newest one waiting
+        self.frame_slot = FrameSlot()
+
+    def update(
+        self,
+        faces: List[Dict[str, Any]],
+        timestamp: Optional[float] = None,
+        cached: bool = False,
+        question_id: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Record the analysis result of one frame
+
+        Args:
+            faces: Face results for the frame (EmotionDetector.analyze_frame format)
+            timestamp: Frame timestamp in seconds (defaults to time since session start)
+            cached: Whether the result was reused from a near-identical frame
+            question_id: Question the frame belongs to (defaults to the current question)
+
+        Returns:
+            Compact per-frame result for streaming clients
+        """
+        self.last_seen = time.time()
+        if timestamp is None:
+            timestamp = round(self.last_seen - self.started_at, 3)
+
+        if question_id is not None:
+            self.question_id = question_id
+
+        self.frames += 1
+        self.last_faces = faces
+        self.aggregator.update_faces(faces, timestamp)
+        if self.question_id is not None:
+            self.question(self.question_id).update_faces(faces, timestamp)
+
+        result = {"seq": self.frames, "t": timestamp, "n": len(faces)}
+        if cached:
+            result["cached"] = True
+
+        if faces:
+            # Primary emotion from first detected face
+            primary = faces[0]
+            emotion = primary['emotion']
+            location = primary['location']
+            sentiment = SENTIMENT_MAPPING.get(emotion, 0.0)
+
+            self.last_face = location
+
+            result.update({
+                "e": emotion,
+                "c": round(primary['confidence'], 3),
+                "s": sentiment,
+                "box": [location['top'], location['right'], location['bottom'], location['left']],
+            })
+
+        return result
+
+    def question(self, question_id: int) -> EmotionAggregator:
+        """
+        Get the aggregator for one question of the interview, creating it if needed
+
+        Args:
+            question_id: Question ID
+
+        Returns:
+            EmotionAggregator instance
+        """
+        aggregator = self.questions.get(question_id)
+        if aggregator is None:
+            aggregator = EmotionAggregator(self.ema_alpha)
+            self.questions[question_id] = aggregator
+
+        return aggregator
+
+    def summary(self, question_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Get the running summary of the session or one of its questions
+
+        Args:
+            question_id: Summarize only this question (None for the whole interview)
+
+        Returns:
+            Summary in the same shape as the /emotion/timeline summary
+        """
+        if question_id is not None:
+            aggregator = self.questions.get(question_id) or EmotionAggregator(self.ema_alpha)
+            return {
+                'interview_id': self.interview_id,
+                'question_id': question_id,
+                **aggregator.snapshot(),
+            }
+
+        return {
+            'interview_id': self.interview_id,
+            'question_id': self.question_id,
+            **self.aggregator.snapshot(),
+            'last_face': self.last_face,
+            'tracking': self.face_track.stats() if self.face_track else None,
+            'dedup': self.frame_cache.stats() if self.frame_cache else None,
+            'sampling': self.sampler.stats() if self.sampler else None,
+        }
+
+
+class SessionRegistry:
+    """
+    Emotion sessions keyed by interview id.
+
+    Sessions idle for longer than `ttl_seconds` are dropped the next time
+    the registry is accessed, so abandoned interviews do not leak memory.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 900.0,
+        redetect_interval: int = 5,
+        dedup_distance: int = 4,
+        dedup_window_seconds: float = 2.0,
+        dedup_cache_size: int = 8,
+        ema_alpha: float = 0.1,
+        sampling_min_rate: float = 0.5,
+        sampling_max_rate: float = 5.0,
+        sampling_threshold: float = 8.0
+    ):
+        """
+        Args:
+            ttl_seconds: Idle time after which a session is discarded
+            redetect_interval: Full face detection every N frames for new sessions
+            dedup_distance: Max hash distance for reusing a near-identical frame's result
+            dedup_window_seconds: Max age of a reused result (0 disables deduplication)
+            dedup_cache_size: Cached frames per session
+            ema_alpha: Weight of the newest frame in the sentiment EMA
+            sampling_min_rate: Floor analysis rate of static scenes (0 disables adaptive sampling)
+            sampling_max_rate: Maximum analysis rate while the scene changes
+            sampling_threshold: Thumbnail difference score that counts as a change
+        """
+        self.ttl_seconds = ttl_seconds
+        self.redetect_interval = redetect_interval
+        self.dedup_distance = dedup_distance
+        self.dedup_window_seconds = dedup_window_seconds
+        self.dedup_cache_size = dedup_cache_size
+        self.ema_alpha = ema_alpha
+        self.sampling_min_rate = sampling_min_rate
+        self.sampling_max_rate = sampling_max_rate
+        self.sampling_threshold = sampling_threshold
+        self._sessions: Dict[int, EmotionSession] = {}
+        self._last_prune = time.time()
+
+    def get(self, interview_id: int) -> EmotionSession:
+        """
+        Get the session for an interview, creating it if needed
+
+        Args:
+            interview_id: Interview ID
+
+        Returns:
+            EmotionSession instance
+        """
+        self._prune()
+
+        session = self._sessions.get(interview_id)
+        if session is None:
+            frame_cache = (
+                FrameCache(self.dedup_distance, self.dedup_window_seconds, self.dedup_cache_size)
+                if self.dedup_window_seconds > 0 else None
+            )
+            sampler = (
+                AdaptiveSampler(self.sampling_min_rate, self.sampling_max_rate, self.sampling_threshold)
+                if self.sampling_min_rate > 0 else None
+            )
+            session = EmotionSession(
+                interview_id, self.redetect_interval, frame_cache, self.ema_alpha, sampler
+            )
+            self._sessions[interview_id] = session
+
+        return session
+
+    def find(self, interview_id: int) -> Optional[EmotionSession]:
+        """
+        Get the session for an interview without creating it
+
+        Args:
+            interview_id: Interview ID
+
+        Returns:
+            EmotionSession instance, or None if the interview has no live session
+        """
+        self._prune()
+        return self._sessions.get(interview_id)
+
+    def close(self, interview_id: int) -> Optional[EmotionSession]:
+        """
+        Remove and return the session for an interview
+
+        Args:
+            interview_id: Interview ID
+
+        Returns:
+            The removed session, or None if there was none
+        """
+        return self._sessions.pop(interview_id, None)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def dedup_stats(self) -> Dict[str, Any]:
+        """
+        Get frame deduplication statistics across live sessions
+
+        Returns:
+            Dictionary with total hits, misses and hit rate
+        """
+        hits = misses = 0
+        for session in self._sessions.values():
+            if session.frame_cache is not None:
+                hits += session.frame_cache.hits
+                misses += session.frame_cache.misses
+
+        return {
+            'enabled': self.dedup_window_seconds > 0,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def _prune(self) -> None:
+        """Drop sessions that have been idle longer than the TTL"""
+        now = time.time()
+
+        # Scanning every session on every frame is wasteful - prune at most once a minute
+        if now - self._last_prune < min(60.0, self.ttl_seconds):
+            return
+        self._last_prune = now
+
+        cutoff = now - self.ttl_seconds
+        expired = [key for key, session in self._sessions.items() if session.last_seen < cutoff]
+
+        for key in expired:
+            del self._sessions[key]
+
+
+# Singleton instance
+_session_registry: Optional[SessionRegistry] = None
+
+
+def get_session_registry(
+    ttl_seconds: float = 900.0,
+    redetect_interval: int = 5,
+    dedup_distance: int = 4,
+    dedup_window_seconds: float = 2.0,
+    dedup_cache_size: int = 8,
+    ema_alpha: float = 0.1,
+    sampling_min_rate: float = 0.5,
+    sampling_max_rate: float = 5.0,
+    sampling_threshold: float = 8.0
+) -> SessionRegistry:
+    """
+    Get singleton instance of the session registry
+
+    Args:
+        ttl_seconds: Session idle TTL (only used on first call)
+        redetect_interval: Full detection interval (only used on first call)
+        dedup_distance: Frame dedup hash distance (only used on first call)
+        dedup_window_seconds: Frame dedup window (only used on first call)
+        dedup_cache_size: Frame dedup cache size (only used on first call)
+        ema_alpha: Sentiment EMA weight (only used on first call)
+        sampling_min_rate: Adaptive sampling floor rate (only used on first call)
+        sampling_max_rate: Adaptive sampling max rate (only used on first call)
+        sampling_threshold: Adaptive sampling change threshold (only used on first call)
+
+    Returns:
+        SessionRegistry instance
+    """
+    global _session_registry
+
+    if _session_registry is None:
+        _session_registry = SessionRegistry(
+            ttl_seconds, redetect_interval, dedup_distance, dedup_window_seconds,
+            dedup_cache_size, ema_alpha, sampling_min_rate, sampling_max_rate, sampling_threshold
+        )
+
+    return _session_registry
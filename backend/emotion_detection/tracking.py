@@ -0,0 +1,172 @@
+"""
+Face Tracking
+Cheap template-matching tracker used between full face detections,
+so dlib HOG only runs every few frames of a live session
+"""
+
+import numpy as np
+from typing import List, Optional
+
+
+# Face templates are matched at this width (pixels) regardless of face size
+TEMPLATE_SIZE = 32
+
+# Search window around the previous box, as a fraction of the box size
+SEARCH_MARGIN = 0.5
+
+# Minimum normalized cross-correlation to accept a tracked position
+MIN_MATCH_SCORE = 0.6
+
+
+class FaceTrack:
+    """
+    Tracking state for the faces of one live session.
+
+    The object is small and picklable so it can travel with a frame to a
+    worker process and come back updated. Full detection is requested on
+    the first frame, every `redetect_interval` frames, whenever no face
+    is being tracked, and whenever the tracker loses a face.
+    """
+
+    def __init__(self, redetect_interval: int = 5):
+        """
+        Args:
+            redetect_interval: Run full face detection every N frames
+        """
+        self.redetect_interval = max(1, redetect_interval)
+        self.boxes: List[tuple] = []
+        self.templates: List[np.ndarray] = []
+        self.frames_since_detection = 0
+
+        self.detections = 0
+        self.tracked_frames = 0
+
+    @property
+    def needs_detection(self) -> bool:
+        """Whether the next frame must go through full face detection"""
+        return not self.boxes or self.frames_since_detection + 1 >= self.redetect_interval
+
+    def reset(self, gray_frame: np.ndarray, face_locations: List[tuple]) -> None:
+        """
+        Start tracking the faces found by a full detection
+
+        Args:
+            gray_frame: Grayscale frame the faces were detected in
+            face_locations: Detected (top, right, bottom, left) boxes
+        """
+        self.boxes = list(face_locations)
+        self.templates = [_make_template(gray_frame, box) for box in self.boxes]
+        self.frames_since_detection = 0
+        self.detections += 1
+
+    def update(self, gray_frame: np.ndarray) -> Optional[List[tuple]]:
+        """
+        Follow the tracked faces into a new frame
+
+        Args:
+            gray_frame: Grayscale frame
+
+        Returns:
+            Updated (top, right, bottom, left) boxes, or None if any face
+            was lost and full detection is needed
+        """
+        boxes = []
+
+        for box, template in zip(self.boxes, self.templates):
+            tracked_box = _match_template(gray_frame, box, template)
+            if tracked_box is None:
+                return None
+            boxes.append(tracked_box)
+
+        self.boxes = boxes
+        self.frames_since_detection += 1
+        self.tracked_frames += 1
+
+        return boxes
+
+    def stats(self) -> dict:
+        """
+        Get tracking statistics
+
+        Returns:
+            Dictionary with detection and tracked frame counts
+        """
+        return {
+            'redetect_interval': self.redetect_interval,
+            'detections': self.detections,
+            'tracked_frames': self.tracked_frames,
+        }
+
+
+def _template_scale(box: tuple) -> float:
+    """Scale factor that maps a face box to TEMPLATE_SIZE width"""
+    top, right, bottom, left = box
+    return TEMPLATE_SIZE / max(1, right - left)
+
+
+def _make_template(gray_frame: np.ndarray, box: tuple) -> np.ndarray:
+    """
+    Extract a downscaled face template
+
+    Args:
+        gray_frame: Grayscale frame
+        box: (top, right, bottom, left) face box
+
+    Returns:
+        Face template (TEMPLATE_SIZE pixels wide)
+    """
+    # OpenCV is loaded by the first tracked frame, not at API startup
+    import cv2
+
+    top, right, bottom, left = box
+    scale = _template_scale(box)
+    face = gray_frame[max(0, top):bottom, max(0, left):right]
+
+    size = (max(1, round(face.shape[1] * scale)), max(1, round(face.shape[0] * scale)))
+    return cv2.resize(face, size, interpolation=cv2.INTER_AREA)
+
+
+def _match_template(gray_frame: np.ndarray, box: tuple, template: np.ndarray) -> Optional[tuple]:
+    """
+    Find a face template near its previous position
+
+    Matching is done on a downscaled search window, so the cost does not
+    depend on the face or frame resolution.
+
+    Args:
+        gray_frame: Grayscale frame
+        box: Previous (top, right, bottom, left) face box
+        template: Face template from the last detection
+
+    Returns:
+        New (top, right, bottom, left) box, or None if the match is too weak
+    """
+    top, right, bottom, left = box
+    width, height = right - left, bottom - top
+    frame_height, frame_width = gray_frame.shape[:2]
+
+    # Search window around the previous box, clipped to the frame
+    x0 = max(0, left - int(width * SEARCH_MARGIN))
+    y0 = max(0, top - int(height * SEARCH_MARGIN))
+    x1 = min(frame_width, right + int(width * SEARCH_MARGIN))
+    y1 = min(frame_height, bottom + int(height * SEARCH_MARGIN))
+
+    scale = _template_scale(box)
+    window_size = (round((x1 - x0) * scale), round((y1 - y0) * scale))
+
+    if window_size[0] < template.shape[1] or window_size[1] < template.shape[0]:
+        return None
+
+    import cv2
+
+    window = cv2.resize(gray_frame[y0:y1, x0:x1], window_size, interpolation=cv2.INTER_AREA)
+    scores = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+    _, best_score, _, best_location = cv2.minMaxLoc(scores)
+
+    if best_score < MIN_MATCH_SCORE:
+        return None
+
+    new_left = x0 + int(round(best_location[0] / scale))
+    new_top = y0 + int(round(best_location[1] / scale))
+
+    return (new_top, new_left + width, new_top + height, new_left)
@@ -0,0 +1,82 @@
+"""
+Video Frame Sampling
+Lazily samples frames from recorded answer videos so whole files are never
+held in memory, for offline emotion analysis of uploaded answers
+"""
+
+from typing import Iterable, Iterator, List, Tuple
+
+import cv2
+import numpy as np
+
+
+def sample_video_frames(video_path: str, sample_fps: float = 2.0) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    Yield frames of a video at roughly `sample_fps` frames per second
+
+    Frames between samples are only grabbed (demuxed), not decoded into
+    images, so skipping costs far less than reading every frame.
+
+    Args:
+        video_path: Path to a video file readable by OpenCV
+        sample_fps: Frames to sample per second of video (0 samples every frame)
+
+    Yields:
+        (timestamp in seconds, BGR frame) tuples
+
+    Raises:
+        ValueError: If the video cannot be opened
+    """
+    capture = cv2.VideoCapture(video_path)
+    if not capture.isOpened():
+        raise ValueError(f"Could not open video: {video_path}")
+
+    # MediaRecorder WebM files often report no (or a bogus) frame rate,
+    # so timestamps come from the container when it provides them
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    fps = fps if 0 < fps < 240 else 30.0
+    interval = 1.0 / sample_fps if sample_fps > 0 else 0.0
+
+    try:
+        index = 0
+        next_sample = 0.0
+
+        while capture.grab():
+            position_ms = capture.get(cv2.CAP_PROP_POS_MSEC)
+            timestamp = position_ms / 1000.0 if position_ms > 0 or index == 0 else index / fps
+            index += 1
+
+            if timestamp + 1e-6 < next_sample:
+                continue
+
+            ok, frame = capture.retrieve()
+            if not ok:
+                continue
+
+            next_sample = timestamp + interval
+            yield round(timestamp, 3), frame
+    finally:
+        capture.release()
+
+
+def batched(items: Iterable, batch_size: int) -> Iterator[List]:
+    """
+    Group an iterable into lists of at most `batch_size` items
+
+    Args:
+        items: Any iterable (consumed lazily)
+        batch_size: Maximum items per batch
+
+    Yields:
+        Lists of items
+    """
+    batch = []
+
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch